@@ -0,0 +1,54 @@
+"""
+This file contains the helpers to build and compare ETags.
+"""
+
+import hashlib
+from typing import Any, Iterable, Optional
+
+
+def make_etag(parts: Iterable[Any]) -> str:
+    """
+    Build a weak ETag from the values that identify a representation.
+
+    Args:
+        parts: Values that change whenever the representation changes, such
+            as ids and row versions.
+
+    Returns:
+        The ETag, e.g. ``W/"5d41402abc4b2a76"``.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for part in parts:
+        digest.update(str(part).encode())
+        digest.update(b"\0")
+    return f'W/"{digest.hexdigest()}"'
+
+
+def model_etag(db_obj: Any) -> str:
+    """
+    Build the ETag of a single model from its id and row version.
+    """
+    return make_etag([db_obj.id, db_obj.version])
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match or If-Match header against an ETag.
+
+    The comparison is weak: ``W/"x"`` and ``"x"`` are the same tag.
+
+    Args:
+        header: The raw header value, a list of tags or ``*``.
+        etag: The current ETag of the resource.
+
+    Returns:
+        Whether any tag in the header matches.
+    """
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque for tag in header.split(",")
+    )
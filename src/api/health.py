@@ -0,0 +1,47 @@
+"""
+This file contains API endpoints to check the health of the application.
+"""
+
+from fastapi import APIRouter
+
+from config.database import (
+    async_engine,
+    async_read_engines,
+    engine,
+    get_pool_status,
+    read_engines,
+)
+from crud.todo import todo as todo_crud
+from jobs.purge import purge_job
+
+router = APIRouter()
+
+
+@router.get("/db")
+def get_db_health() -> dict:
+    """
+    Get the live checkout statistics of the database connection pools.
+    """
+    return {
+        "sync": get_pool_status(engine.pool),
+        "async": get_pool_status(async_engine.pool),
+        "sync_read": [get_pool_status(e.pool) for e in read_engines],
+        "async_read": [get_pool_status(e.pool) for e in async_read_engines],
+    }
+
+
+@router.get("/cache")
+def get_cache_health() -> dict:
+    """
+    Get the hit, miss and eviction counters of the CRUD caches.
+    """
+    cache = todo_crud.cache
+    return {"todo": cache.stats() if cache is not None else None}
+
+
+@router.get("/purge")
+def get_purge_health() -> dict:
+    """
+    Get the progress counters of the purge job.
+    """
+    return purge_job.stats()
@@ -0,0 +1,234 @@
+"""
+This file contains the helpers to stream Todos as NDJSON or CSV, in and out.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Tuple,
+    Union,
+)
+
+MAX_LINE_SIZE = 64 * 1024
+MAX_CSV_RECORD_SIZE = 64 * 1024
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def json_default(value: Any) -> str:
+    """
+    Serialize the values the json module doesn't know about.
+    """
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_ndjson(rows: Iterable[Mapping[str, Any]]) -> str:
+    """
+    Encode rows as newline delimited JSON.
+    """
+    return "".join(
+        json.dumps(dict(row), default=json_default) + "\n" for row in rows
+    )
+
+
+def encode_csv(rows: Iterable[Mapping[str, Any]], columns: List[str]) -> str:
+    """
+    Encode rows as CSV lines in the order of ``columns``.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(
+            [
+                value.isoformat() if isinstance(value, datetime) else value
+                for value in (row[column] for column in columns)
+            ]
+        )
+    return buffer.getvalue()
+
+
+async def stream_rows(
+    partitions: AsyncIterator[List[Mapping[str, Any]]],
+    format: str,
+    columns: List[str],
+) -> AsyncIterator[str]:
+    """
+    Encode partitions of rows as they are fetched from the database.
+
+    Args:
+        partitions: The batches of rows to encode.
+        format: Either ``ndjson`` or ``csv``.
+        columns: The columns of the rows, used for the CSV header.
+
+    Yields:
+        One encoded chunk per partition.
+    """
+    if format == "csv":
+        yield encode_csv([dict(zip(columns, columns))], columns)
+    async for rows in partitions:
+        if format == "csv":
+            yield encode_csv(rows, columns)
+        else:
+            yield encode_ndjson(rows)
+
+
+def decode_line(parts: List[bytes]) -> Union[str, ValueError]:
+    """
+    Decode the parts of a line, or get the error if it isn't valid UTF-8.
+    """
+    try:
+        return b"".join(parts).decode("utf-8").rstrip("\r")
+    except UnicodeDecodeError:
+        return ValueError("Invalid UTF-8")
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[Union[str, ValueError]]:
+    """
+    Split a stream of UTF-8 bytes in lines as the bytes arrive.
+
+    Only the newly arrived bytes are searched for line breaks, and only the
+    current partial line is buffered, up to MAX_LINE_SIZE bytes, never the
+    whole body. A longer line is dropped as it arrives.
+
+    Yields:
+        Each line, or the error that made it unreadable: too long or not
+        valid UTF-8.
+    """
+    parts: List[bytes] = []
+    size, too_long = 0, False
+    async for chunk in chunks:
+        *ends, rest = chunk.split(b"\n")
+        for end in ends:
+            if too_long or size + len(end) > MAX_LINE_SIZE:
+                yield ValueError("Line too long")
+            else:
+                parts.append(end)
+                yield decode_line(parts)
+            parts, size, too_long = [], 0, False
+        if too_long:
+            continue
+        if size + len(rest) > MAX_LINE_SIZE:
+            parts, size, too_long = [], 0, True
+        elif rest:
+            parts.append(rest)
+            size += len(rest)
+    if too_long:
+        yield ValueError("Line too long")
+    elif parts:
+        yield decode_line(parts)
+
+
+async def iter_records(
+    lines: AsyncIterator[str], format: str
+) -> AsyncIterator[Tuple[int, Union[Dict[str, Any], ValueError]]]:
+    """
+    Parse NDJSON or CSV lines in records.
+
+    CSV input must start with a header line naming the columns. A quoted
+    value may span several lines, as the export writes multi-line
+    descriptions, up to MAX_CSV_RECORD_SIZE characters per record.
+
+    Args:
+        lines: The lines of the body, or the errors replacing unreadable
+            ones.
+        format: Either ``ndjson`` or ``csv``.
+
+    Yields:
+        The number of the first line of each record along with the record,
+        or the error that made it unreadable. Blank lines are skipped.
+    """
+    if format == "csv":
+        records = iter_csv_records(lines)
+    else:
+        records = aenumerate(lines, 1)
+
+    header = None
+    async for number, line in records:
+        if isinstance(line, ValueError):
+            yield number, line
+            continue
+        if not line.strip():
+            continue
+        try:
+            if format == "csv":
+                values = next(csv.reader([line]))
+                if header is None:
+                    header = values
+                    continue
+                if len(values) != len(header):
+                    raise ValueError(
+                        f"Expected {len(header)} values, got {len(values)}"
+                    )
+                record = dict(zip(header, values))
+            else:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("Expected a JSON object")
+        except (ValueError, csv.Error) as error:
+            yield number, ValueError(str(error))
+        else:
+            yield number, record
+
+
+async def iter_csv_records(
+    lines: AsyncIterator[Union[str, ValueError]],
+) -> AsyncIterator[Tuple[int, Union[str, ValueError]]]:
+    """
+    Join the lines of CSV records whose quoted values span several lines.
+
+    A record is complete once it holds an even number of quotes, since
+    quotes inside values are doubled. A record longer than
+    MAX_CSV_RECORD_SIZE, or holding an unreadable line, is reported as an
+    error and skipped.
+
+    Yields:
+        The number of the first line of each record along with its text,
+        or an error for an unterminated or oversized quoted value.
+    """
+    record, start, quotes = None, 0, 0
+    async for number, line in aenumerate(lines, 1):
+        if isinstance(line, ValueError):
+            yield number, line
+            # The rest of an open record is skipped, up to its closing quote.
+            record = None
+            continue
+        if quotes % 2 == 0:
+            record, start, quotes = line, number, 0
+        elif record is not None:
+            record += "\n" + line
+        quotes += line.count('"')
+        if quotes % 2 == 0:
+            if record is not None:
+                yield start, record
+        elif record is not None and len(record) > MAX_CSV_RECORD_SIZE:
+            # The rest of the record is skipped, up to its closing quote.
+            yield start, ValueError("Quoted value too long")
+            record = None
+    if quotes % 2 == 1 and record is not None:
+        yield start, ValueError("Unterminated quoted value")
+
+
+async def aenumerate(
+    items: AsyncIterator[Any], start: int = 0
+) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Async version of ``enumerate``.
+    """
+    index = start
+    async for item in items:
+        yield index, item
+        index += 1
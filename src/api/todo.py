@@ -2,67 +2,446 @@
 This file contains API endpoints for the Todo resource.
 """
 
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import ValidationError
 
-from config.database import get_db
+from api.etag import etag_matches, make_etag, model_etag
+from api.streaming import MEDIA_TYPES, iter_lines, iter_records, stream_rows
+from config.database import async_session, get_async_db
+from crud.base import VersionConflictError
 from crud.todo import todo as todo_crud
-from schemas.todo import Todo, TodoAll, TodoCreate, TodoResponse, TodoUpdate
+from schemas.todo import (
+    Todo,
+    TodoAll,
+    TodoBulk,
+    TodoBulkUpdate,
+    TodoCreate,
+    TodoImport,
+    TodoPatch,
+    TodoResponse,
+    TodoUpdate,
+    get_page_adapter,
+)
 
 router = APIRouter()
 
+MAX_BULK_ITEMS = 10_000
+MAX_IMPORT_ERRORS = 100
+SORT_ORDERS = {
+    "created": ("date_created", False),
+    "-created": ("date_created", True),
+    "title": ("title", False),
+    "-title": ("title", True),
+}
+
+
+def check_bulk_size(items: List[Any]):
+    """
+    Reject bulk requests above MAX_BULK_ITEMS items.
+    """
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {MAX_BULK_ITEMS} items per request",
+        )
+
 
 @router.post("/", response_model=TodoResponse)
-def create_todo(todo: TodoCreate, db=Depends(get_db)) -> TodoResponse:
+async def create_todo(
+    todo: TodoCreate, db=Depends(get_async_db)
+) -> TodoResponse:
     """
     Create a new Todo.
     """
-    todo = todo_crud.create(db, todo)
+    todo = await todo_crud.acreate(db, todo)
     return todo
 
 
-@router.get("/", response_model=TodoAll)
-def get_all_todos(db=Depends(get_db)) -> TodoAll:
+@router.get("/", response_model=TodoAll, response_class=ORJSONResponse)
+async def get_all_todos(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    approximate_total: bool = False,
+    is_completed: Optional[bool] = None,
+    title_prefix: Optional[str] = Query(None, min_length=1),
+    sort: Literal["created", "-created", "title", "-title"] = "created",
+    fields: Optional[str] = Query(None, examples=["id,title,is_completed"]),
+    if_none_match: Optional[str] = Header(None),
+    db=Depends(get_async_db),
+) -> TodoAll:
+    """
+    Get a page of Todos.
+
+    Filter the Todos with ``is_completed`` and ``title_prefix``, and order
+    them with ``sort``; a leading ``-`` sorts in descending order. Pass a
+    comma-separated list of columns as ``fields`` to only get those.
+
+    Pass the ``next_cursor`` of a page as ``cursor`` to get the next one, with
+    the same filters and sort order. The page carries an ETag; sending it
+    back in ``If-None-Match`` returns an empty 304 while the page hasn't
+    changed.
+
+    Without filters, ``approximate_total`` returns the planner's estimate of
+    the table size on Postgres instead of counting, which includes the
+    soft-deleted Todos not purged yet.
+    """
+    columns = list(TodoResponse.model_fields)
+    if fields is not None:
+        columns = list(dict.fromkeys(filter(None, fields.split(","))))
+        unknown = set(columns) - set(TodoResponse.model_fields)
+        if not columns:
+            raise HTTPException(status_code=400, detail="No fields requested")
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+            )
+
+    order_by, descending = SORT_ORDERS[sort]
+    filters = {}
+    if is_completed is not None:
+        filters["is_completed"] = is_completed
+    prefixes = {"title": title_prefix} if title_prefix else None
+    try:
+        todos = await todo_crud.aall(
+            db,
+            limit,
+            cursor,
+            approximate_total=approximate_total,
+            filters=filters,
+            prefixes=prefixes,
+            order_by=order_by,
+            descending=descending,
+            # The ETag needs the ids and versions, even when not requested.
+            columns=list(dict.fromkeys([*columns, "id", "version"])),
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+
+    etag = make_etag(
+        [todos["total"], todos["next_cursor"], ",".join(columns)]
+        + [f"{todo['id']}:{todo['version']}" for todo in todos["data"]]
+    )
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    # The rows are plain dicts of the TodoResponse columns, validated in one
+    # pydantic-core pass, which drops the columns that weren't requested,
+    # then encoded by orjson.
+    page = get_page_adapter(tuple(columns)).validate_python(todos)
+    return ORJSONResponse(page, headers={"ETag": etag})
+
+
+@router.post("/bulk", response_model=TodoBulk)
+async def bulk_create_todos(
+    items: List[Dict[str, Any]] = Body(...), db=Depends(get_async_db)
+) -> TodoBulk:
+    """
+    Create many Todos in a single transaction.
+
+    Items that fail validation are reported in ``errors`` and the rest are
+    created.
+    """
+    check_bulk_size(items)
+    todos, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            todos.append(TodoCreate.model_validate(item))
+        except ValidationError as error:
+            errors.append(
+                {"index": index, "detail": error.errors(include_url=False)}
+            )
+    result = await todo_crud.abulk_create(db, todos)
+    return {"data": result["data"], "errors": errors}
+
+
+@router.patch("/bulk", response_model=TodoBulk)
+async def bulk_update_todos(
+    items: List[TodoBulkUpdate], db=Depends(get_async_db)
+) -> TodoBulk:
+    """
+    Update many Todos in a single transaction.
+
+    Only the fields present in each item are changed. Missing Todos are
+    reported in ``errors``.
+    """
+    check_bulk_size(items)
+    objs_in = [item.model_dump(exclude_unset=True) for item in items]
+    return await todo_crud.abulk_update(db, objs_in)
+
+
+@router.delete("/bulk", response_model=TodoBulk)
+async def bulk_delete_todos(
+    ids: List[UUID] = Body(...), db=Depends(get_async_db)
+) -> TodoBulk:
+    """
+    Delete many Todos in a single transaction.
+
+    Missing Todos are reported in ``errors``.
+    """
+    check_bulk_size(ids)
+    return await todo_crud.abulk_delete(db, ids)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_todos(
+    format: Literal["ndjson", "csv"] = "ndjson",
+) -> StreamingResponse:
+    """
+    Export every Todo as NDJSON or CSV.
+
+    Rows are streamed from a server-side cursor as they are read, so memory
+    use doesn't grow with the size of the table.
+    """
+
+    async def content():
+        # The request session is closed before the body is sent, so the
+        # stream needs a session of its own.
+        async with async_session() as db:
+            partitions = todo_crud.astream(db)
+            async for chunk in stream_rows(partitions, format, columns):
+                yield chunk
+
+    columns = [column.name for column in todo_crud.model.__table__.columns]
+    return StreamingResponse(
+        content(),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="todos.{format}"'
+        },
+    )
+
+
+@router.post("/import", response_model=TodoImport)
+async def import_todos(
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    chunk_size: int = Query(500, ge=1, le=MAX_BULK_ITEMS),
+    db=Depends(get_async_db),
+) -> TodoImport:
+    """
+    Import Todos from an NDJSON or CSV body.
+
+    The body is parsed as it arrives and every ``chunk_size`` valid lines are
+    inserted and committed, so the file is never held in memory. Lines that
+    can't be parsed or validated, aren't valid UTF-8 or are longer than
+    MAX_LINE_SIZE bytes are skipped and counted; the first
+    MAX_IMPORT_ERRORS of them are reported.
+    """
+    start = time.perf_counter()
+    inserted, rejected, errors = 0, 0, []
+    batch = []
+
+    lines = iter_lines(request.stream())
+    async for number, record in iter_records(lines, format):
+        try:
+            if isinstance(record, ValueError):
+                raise record
+            batch.append(TodoCreate.model_validate(record))
+        except ValueError as error:
+            rejected += 1
+            if len(errors) < MAX_IMPORT_ERRORS:
+                detail = (
+                    error.errors(include_url=False)
+                    if isinstance(error, ValidationError)
+                    else str(error)
+                )
+                errors.append({"line": number, "detail": detail})
+            continue
+
+        if len(batch) >= chunk_size:
+            await todo_crud.abulk_create(db, batch, chunk_size)
+            inserted += len(batch)
+            batch = []
+
+    if batch:
+        await todo_crud.abulk_create(db, batch, chunk_size)
+        inserted += len(batch)
+
+    return {
+        "inserted": inserted,
+        "rejected": rejected,
+        "errors": errors,
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+@router.get("/search", response_model=TodoAll)
+async def search_todos(
+    q: str = Query(..., min_length=1, max_length=256),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db=Depends(get_async_db),
+) -> TodoAll:
     """
-    Get all Todos.
+    Search the title and description of the Todos, best matches first.
+
+    Todos must match every word of ``q``. Page through the results with
+    ``limit`` and ``offset``.
     """
-    todos = todo_crud.all(db)
-    return todos
+    return await todo_crud.asearch(db, q, limit, offset)
 
 
-@router.get("/{todo_id}", response_model=Todo)
-def get_todo(todo_id: UUID, db=Depends(get_db)) -> Todo:
+@router.get("/{todo_id}", response_model=TodoResponse)
+async def get_todo(
+    todo_id: UUID,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db=Depends(get_async_db),
+) -> TodoResponse:
     """
     Get a single Todo
+
+    Returns an empty 304 when ``If-None-Match`` holds the current ETag.
     """
-    todo = todo_crud.get(db, todo_id)
+    todo = await todo_crud.aget(db, todo_id)
 
     if not todo:
         raise HTTPException(status_code=404, detail="Todo not found")
 
+    etag = model_etag(todo)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
     return todo
 
 
-@router.put("/{todo_id}", response_model=Todo)
-def update_todo(todo_id: UUID, obj_in: TodoUpdate, db=Depends(get_db)) -> Todo:
+async def write_todo(
+    db,
+    todo_id: UUID,
+    write: Callable[[Optional[int]], Awaitable[Optional[Any]]],
+    version: Optional[int],
+    if_match: Optional[str],
+):
     """
-    Update a Todo.
+    Run a conditional write on a Todo.
+
+    With ``version`` the write only applies to that version of the Todo,
+    and fails with a 409 otherwise. ``If-Match`` is checked against the
+    current Todo, and the write is then conditional on its version, so a
+    concurrent write in between also fails the precondition with a 412.
+    Without either, the write is a single UPDATE statement.
+
+    Args:
+        db: The database session.
+        todo_id: The id of the Todo.
+        write: Writes to the Todo given the version it must still have.
+        version: The version of the Todo the client last read.
+        if_match: The If-Match header.
+
+    Returns:
+        The written Todo.
     """
-    db_obj = todo_crud.get(db, todo_id)
-    if not db_obj:
+    conflict_status = 409
+    if if_match is not None:
+        db_obj = await todo_crud.aget(db, todo_id)
+        if not db_obj:
+            raise HTTPException(status_code=404, detail="Todo not found")
+        if not etag_matches(if_match, model_etag(db_obj)):
+            raise HTTPException(status_code=412, detail="Todo has changed")
+        conflict_status = 412
+        if version is None:
+            version = db_obj.version
+    try:
+        todo = await write(version)
+    except VersionConflictError:
+        raise HTTPException(
+            status_code=conflict_status, detail="Todo has changed"
+        )
+    if not todo:
         raise HTTPException(status_code=404, detail="Todo not found")
-    todo = todo_crud.update(db, db_obj, obj_in)
+    return todo
+
+
+@router.put("/{todo_id}", response_model=TodoResponse)
+async def update_todo(
+    todo_id: UUID,
+    obj_in: TodoUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db=Depends(get_async_db),
+) -> TodoResponse:
+    """
+    Update a Todo.
+
+    Null values are ignored. Send the ``version`` of the Todo that was read
+    to get a 409 instead of overwriting a concurrent update. When
+    ``If-Match`` is sent, the update is rejected with a 412 unless it holds
+    the current ETag of the Todo.
+    """
+    update_data = {
+        key: value
+        for key, value in obj_in.model_dump().items()
+        if value is not None
+    }
+    version = update_data.pop("version", None)
+    todo = await write_todo(
+        db,
+        todo_id,
+        lambda expected: todo_crud.aupdate(db, todo_id, update_data, expected),
+        version,
+        if_match,
+    )
+    response.headers["ETag"] = model_etag(todo)
+    return todo
+
+
+@router.patch("/{todo_id}", response_model=TodoResponse)
+async def patch_todo(
+    todo_id: UUID,
+    obj_in: TodoPatch,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db=Depends(get_async_db),
+) -> TodoResponse:
+    """
+    Update some fields of a Todo, leaving the ones not sent unchanged.
+
+    ``version`` and ``If-Match`` work as for PUT.
+    """
+    update_data = obj_in.model_dump(exclude_unset=True)
+    version = update_data.pop("version", None)
+    todo = await write_todo(
+        db,
+        todo_id,
+        lambda expected: todo_crud.aupdate(db, todo_id, update_data, expected),
+        version,
+        if_match,
+    )
+    response.headers["ETag"] = model_etag(todo)
     return todo
 
 
 @router.delete("/{todo_id}")
-def delete_todo(todo_id: UUID, db=Depends(get_db)) -> Todo:
+async def delete_todo(
+    todo_id: UUID,
+    version: Optional[int] = None,
+    if_match: Optional[str] = Header(None),
+    db=Depends(get_async_db),
+) -> Todo:
     """
     Delete a Todo.
+
+    ``version`` and ``If-Match`` work as for PUT.
     """
-    todo = todo_crud.get(db, todo_id)
-    if not todo:
-        raise HTTPException(status_code=404, detail="Todo not found")
-    todo_crud.delete(db, todo_id)
-    return todo
+    return await write_todo(
+        db,
+        todo_id,
+        lambda expected: todo_crud.adelete(db, todo_id, expected),
+        version,
+        if_match,
+    )
@@ -4,25 +4,130 @@ This file contains the database configuration for the application.
 
 import os
 
-from sqlmodel import Session, SQLModel, create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from config.replicas import RoutingSession, get_read_urls
+from migrations.runner import run_migrations
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def get_async_url(url: str) -> str:
+    """
+    Get the async variant of a database url.
+
+    Args:
+        url: The database url, e.g. ``sqlite:///./test.db``.
+
+    Returns:
+        The same url using the async driver of its dialect.
+    """
+    scheme, _, rest = url.partition("://")
+    dialect = scheme.split("+", 1)[0]
+    if scheme in ASYNC_DRIVERS.values() or dialect not in ASYNC_DRIVERS:
+        return url
+    return f"{ASYNC_DRIVERS[dialect]}://{rest}"
+
+
+def get_bool_env(name: str, default: bool) -> bool:
+    """
+    Read a boolean flag from the environment.
+    """
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def get_engine_options(url: str) -> dict:
+    """
+    Get the connection pool options for an engine.
+
+    The pool is configured through ``DB_POOL_SIZE``, ``DB_MAX_OVERFLOW``,
+    ``DB_POOL_PRE_PING`` and ``DB_POOL_RECYCLE`` (seconds, -1 disables it).
+
+    Args:
+        url: The database url the engine will connect to.
+
+    Returns:
+        The keyword arguments to pass to ``create_engine``.
+    """
+    options = {
+        "pool_pre_ping": get_bool_env("DB_POOL_PRE_PING", True),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "-1")),
+    }
+    # In-memory SQLite uses a singleton pool that can't be sized.
+    if make_url(url).database not in (None, "", ":memory:"):
+        options["pool_size"] = int(os.getenv("DB_POOL_SIZE", "5"))
+        options["max_overflow"] = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    return options
+
+
+def get_pool_status(pool) -> dict:
+    """
+    Get the live checkout statistics of a connection pool.
+    """
+    stats = {"class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        if hasattr(pool, name):
+            stats[name] = getattr(pool, name)()
+    return stats
+
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")
-engine = create_engine(DATABASE_URL)
+ASYNC_DATABASE_URL = os.getenv(
+    "ASYNC_DATABASE_URL", get_async_url(DATABASE_URL)
+)
+
+DATABASE_READ_URLS = get_read_urls()
+
+engine = create_engine(DATABASE_URL, **get_engine_options(DATABASE_URL))
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, **get_engine_options(ASYNC_DATABASE_URL)
+)
+read_engines = [
+    create_engine(url, **get_engine_options(url)) for url in DATABASE_READ_URLS
+]
+async_read_engines = [
+    create_async_engine(get_async_url(url), **get_engine_options(url))
+    for url in DATABASE_READ_URLS
+]
+async_session = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    sync_session_class=RoutingSession,
+    replicas=[read_engine.sync_engine for read_engine in async_read_engines],
+)
 
 
 def init_db():
     """
-    Initialize the database
+    Initialize the database by applying the pending migrations
     """
-    SQLModel.metadata.create_all(engine)
+    run_migrations(engine)
 
 
 def get_db():
     """
     Get a database session
     """
-    db = Session(engine)
-    try:
-        return db
-    finally:
-        db.close()
+    with RoutingSession(
+        engine, expire_on_commit=False, replicas=read_engines
+    ) as db:
+        yield db
+
+
+async def get_async_db():
+    """
+    Get an async database session
+    """
+    async with async_session() as db:
+        yield db
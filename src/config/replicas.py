@@ -0,0 +1,134 @@
+"""
+This file contains the routing of reads to the read replicas of the
+database.
+
+Sessions send their SELECT statements to a random replica and everything
+else to the primary. A session sticks to the primary once it has written,
+and so does every session of a client for ``READ_YOUR_WRITES_SECONDS``
+after one of its requests wrote, so clients never read data older than
+their own writes.
+"""
+
+import os
+import random
+from contextvars import ContextVar
+from typing import List, Optional, Sequence
+
+from sqlalchemy import Engine
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.dml import UpdateBase
+from sqlmodel import Session
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+
+READ_YOUR_WRITES_COOKIE = "read_primary"
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
+
+class ReadState:
+    """
+    How the sessions of the current request read.
+
+    Attributes:
+        primary: Whether reads must go to the primary.
+        wrote: Whether a session of the request wrote to the primary.
+    """
+
+    def __init__(self, primary: bool = False):
+        self.primary = primary
+        self.wrote = False
+
+
+# Holds a mutable state, so the writes of resolvers running in child tasks,
+# which get a copy of the context, are still seen by the middleware.
+read_state: ContextVar[Optional[ReadState]] = ContextVar(
+    "read_state", default=None
+)
+
+
+def get_read_urls() -> List[str]:
+    """
+    Get the replica urls listed, comma-separated, in ``DATABASE_READ_URL``.
+    """
+    urls = os.getenv("DATABASE_READ_URL", "").split(",")
+    return [url.strip() for url in urls if url.strip()]
+
+
+class RoutingSession(Session):
+    """
+    A session reading from the replicas and writing to the primary.
+
+    Without replicas it behaves like a plain session on its bind. Async
+    sessions use it as their ``sync_session_class``, with the ``sync_engine``
+    of the async replica engines.
+
+    Attributes:
+        replicas: The engines SELECT statements are spread over.
+        wrote: Whether the session has written to the primary.
+    """
+
+    def __init__(self, *args, replicas: Sequence[Engine] = (), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self.wrote = False
+
+    @property
+    def reads_from_replicas(self) -> bool:
+        """
+        Whether the SELECT statements of the session go to a replica, whose
+        rows may lag behind the primary.
+        """
+        if not self.replicas or self.wrote:
+            return False
+        state = read_state.get()
+        return state is None or not state.primary
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if not self.replicas:
+            return super().get_bind(mapper, clause=clause, **kwargs)
+
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.wrote = True
+            state = read_state.get()
+            if state is not None:
+                state.wrote = True
+        elif isinstance(clause, Select) and self.reads_from_replicas:
+            return random.choice(self.replicas)
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+class ReadYourWritesMiddleware:
+    """
+    An ASGI middleware keeping a client on the primary after it wrote.
+
+    A request that writes sets a cookie lasting ``window`` seconds, and the
+    requests sent with it read from the primary.
+    """
+
+    def __init__(self, app, window: int = READ_YOUR_WRITES_SECONDS):
+        self.app = app
+        self.window = window
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cookies = HTTPConnection(scope).cookies
+        state = ReadState(primary=READ_YOUR_WRITES_COOKIE in cookies)
+
+        async def send_cookie(message):
+            if message["type"] == "http.response.start" and state.wrote:
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie",
+                    f"{READ_YOUR_WRITES_COOKIE}=1; Max-Age={self.window}; "
+                    "Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        token = read_state.set(state)
+        try:
+            await self.app(scope, receive, send_cookie)
+        finally:
+            read_state.reset(token)
@@ -2,34 +2,122 @@
 This is the base crud file.
 """
 
-from typing import Any, Generic, List, Optional, TypeVar
+import threading
+from collections import OrderedDict
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Generic,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+from uuid import UUID
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel as PydanticBaseModel
-from sqlmodel import Session, select
+from sqlalchemy import (
+    Column,
+    ColumnElement,
+    RowMapping,
+    delete,
+    func,
+    insert,
+    literal,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlmodel import Session, SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from models.base import Base
+from config.replicas import RoutingSession
+from crud.cache import CacheBackend
+from crud.pagination import decode_cursor, encode_cursor, parse_cursor_value
+from models.base import Base, utcnow
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=PydanticBaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=PydanticBaseModel)
 
+BULK_CHUNK_SIZE = 500
+STREAM_BATCH_SIZE = 1000
+# The number of recently invalidated cache keys remembered to keep reads
+# that started before a write from caching what they read.
+TRACKED_INVALIDATIONS = 1024
+
+
+def enumerate_chunks(
+    items: List[Any], size: int
+) -> Iterator[Tuple[int, List[Any]]]:
+    """
+    Split a list in chunks of at most ``size`` items, along with the index of
+    the first item of each chunk.
+    """
+    for start in range(0, len(items), size):
+        yield start, items[start : start + size]
+
+
+def not_found_error(index: int, id: Any) -> Dict[str, Any]:
+    """
+    Build the per-item error of a bulk operation for a missing model.
+    """
+    return {"index": index, "id": id, "detail": "Not found"}
+
+
+class VersionConflictError(Exception):
+    """
+    Raised when a model was written to since the version a write expected.
+
+    Attributes:
+        id: The id of the model.
+        expected: The version the write expected.
+        current: The version the model has.
+    """
+
+    def __init__(self, id: Any, expected: int, current: int):
+        super().__init__(
+            f"Version conflict on {id}: expected {expected}, found {current}"
+        )
+        self.id = id
+        self.expected = expected
+        self.current = current
+
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     """
     A base class for CRUD operations.
+
+    Every operation also has an async variant prefixed with ``a`` (``aget``,
+    ``aall``, ...) that runs the same code on an ``AsyncSession`` without
+    blocking the event loop.
+
     Attributes:
         model: The database model to perform CRUD operations on.
     """
 
-    def __init__(self, model: ModelType):
+    def __init__(self, model: ModelType, cache: Optional[CacheBackend] = None):
         """
         Initialize the CRUD operations.
 
         Args:
             model: The database model to perform CRUD operations
+            cache: The cache ``get`` reads through, if any. Writes made
+                through this class invalidate it.
         """
         self.model = model
+        self.cache = cache
+        self._invalidations = 0
+        self._invalidated = OrderedDict()
+        self._forgotten = 0
+        self._invalidation_lock = threading.Lock()
 
     def get(self, db: Session, id: Any) -> Optional[ModelType]:
         """
@@ -42,35 +130,202 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         Returns:
             The model with the given id.
         """
+        if self.cache is not None:
+            data = self.cache.get(self._cache_key(id))
+            if data is not None:
+                return self._from_cache(db, data)
+
+        started = self._invalidations
         statement = select(self.model).where(
             self.model.id == id,
             self.model.is_active == True,  # noqa E712
         )
-        return db.exec(statement).one_or_none()
+        db_obj = db.exec(statement).one_or_none()
+        if db_obj is not None and self._caches_reads(db):
+            self._fill_cache(db_obj, started)
+        return db_obj
+
+    def get_many(
+        self, db: Session, ids: List[Any]
+    ) -> List[Optional[ModelType]]:
+        """
+        Get many models by id with a single query.
+
+        Args:
+            db: The database session.
+            ids: The ids of the models to get.
+
+        Returns:
+            The models in the order of ``ids``, with None for missing ones.
+        """
+        found = {}
+        missing = []
+        for id in ids:
+            data = self.cache.get(self._cache_key(id)) if self.cache else None
+            if data is not None:
+                found[id] = self._from_cache(db, data)
+            else:
+                missing.append(id)
+
+        if missing:
+            started = self._invalidations
+            statement = select(self.model).where(
+                self.model.id.in_(missing),
+                self.model.is_active == True,  # noqa E712
+            )
+            cache = self._caches_reads(db)
+            for db_obj in db.exec(statement):
+                found[db_obj.id] = db_obj
+                if cache:
+                    self._fill_cache(db_obj, started)
+        return [found.get(id) for id in ids]
 
     def all(
         self,
         db: Session,
-        skip: int = 0,
         limit: int = 100,
+        cursor: Optional[str] = None,
+        alive_only: bool = True,
+        approximate_total: bool = False,
+        filters: Optional[Dict[str, Any]] = None,
+        prefixes: Optional[Dict[str, str]] = None,
+        order_by: str = "date_created",
+        descending: bool = False,
+        columns: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Get a page of models using keyset pagination.
+
+        Rows are ordered by ``(order_by, id)`` and each page starts right
+        after the row the cursor points to, so deep pages cost the same as the
+        first one.
+
+        Args:
+            db: The database session.
+            limit: The maximum number of models in the page.
+            cursor: The ``next_cursor`` of the previous page.
+            alive_only: Whether to skip soft-deleted models.
+            approximate_total: Whether an estimated total is good enough.
+                Ignored when filtering. See ``count`` for what it counts.
+            filters: The values some columns must be equal to.
+            prefixes: The prefixes some string columns must start with.
+            order_by: The column to order the models by.
+            descending: Whether to start from the largest values.
+            columns: The columns to load. The page then holds dictionaries of
+                these columns instead of models.
+
+        Returns:
+            The page, the total number of models and the next cursor.
+
+        Raises:
+            ValueError: If the cursor is malformed or a column doesn't exist.
+        """
+        sort_column = self._column(order_by)
+        order = (sort_column, self.model.__table__.c.id)
+        if columns is None:
+            statement = select(self.model)
+        else:
+            # The ordering columns are needed to build the next cursor. They
+            # are loaded after the requested ones, so each row starts with
+            # the values of ``columns``.
+            columns = list(dict.fromkeys(columns))
+            loaded = list(dict.fromkeys([*columns, order_by, "id"]))
+            statement = select(*(self._column(name) for name in loaded))
+        if alive_only:
+            statement = statement.where(self.model.is_active == True)  # noqa E712
+        statement = statement.where(*self._criteria(filters, prefixes))
+        if cursor:
+            value, id = decode_cursor(cursor)
+            try:
+                python_type = sort_column.type.python_type
+            except NotImplementedError:
+                # SQLModel's AutoString doesn't declare its Python type.
+                python_type = str
+            try:
+                after = tuple_(parse_cursor_value(python_type, value), UUID(id))
+            except ValueError as error:
+                raise ValueError("Invalid cursor") from error
+            key = tuple_(*order)
+            statement = statement.where(
+                key < after if descending else key > after
+            )
+        statement = statement.order_by(
+            *(column.desc() if descending else column for column in order)
+        ).limit(limit + 1)
+
+        if columns is None:
+            results = db.exec(statement).all()
+        else:
+            # Plain tuples, without an ORM object or a mapping per row.
+            results = db.execute(statement).tuples().all()
+
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            last = results[-1]
+            if columns is None:
+                values = [getattr(last, order_by), last.id]
+            else:
+                values = [last[loaded.index(name)] for name in (order_by, "id")]
+            next_cursor = encode_cursor(values)
+
+        if columns is not None:
+            results = [dict(zip(columns, row)) for row in results]
+        total = self.count(
+            db,
+            alive_only,
+            approximate_total,
+            filters=filters,
+            prefixes=prefixes,
+        )
+        return {"total": total, "data": results, "next_cursor": next_cursor}
+
+    def count(
+        self,
+        db: Session,
         alive_only: bool = True,
-    ) -> List[ModelType]:
+        approximate: bool = False,
+        filters: Optional[Dict[str, Any]] = None,
+        prefixes: Optional[Dict[str, str]] = None,
+    ) -> int:
         """
-        Get all models.
+        Count the models.
 
         Args:
             db: The database session.
+            alive_only: Whether to skip soft-deleted models.
+            approximate: Whether to use the planner estimate when the database
+                keeps one (Postgres), which avoids scanning the table. Only
+                possible without filters. The estimate is of every row of
+                the table, so it ignores ``alive_only`` and counts the
+                soft-deleted models until they are purged.
+            filters: The values some columns must be equal to.
+            prefixes: The prefixes some string columns must start with.
 
         Returns:
-            All models.
+            The number of models.
         """
-        statement = select(self.model)
+        if (
+            approximate
+            and not filters
+            and not prefixes
+            and db.get_bind().dialect.name == "postgresql"
+        ):
+            statement = text(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = :name"
+            )
+            estimate = db.execute(
+                statement, {"name": self.model.__tablename__}
+            ).scalar()
+            # reltuples is -1 until the table has been analyzed.
+            if estimate is not None and estimate >= 0:
+                return estimate
+
+        statement = select(func.count()).select_from(self.model)
         if alive_only:
             statement = statement.where(self.model.is_active == True)  # noqa E712
-        statement = statement.offset(skip).limit(limit)
-        results = db.exec(statement).all()
-        total = len(results)
-        return {"total": total, "data": results}
+        statement = statement.where(*self._criteria(filters, prefixes))
+        return db.exec(statement).one()
 
     def create(self, db: Session, obj_in: CreateSchemaType) -> ModelType:
         """
@@ -91,20 +346,33 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return db_obj
 
     def update(
-        self, db: Session, db_obj: ModelType, obj_in: UpdateSchemaType
-    ) -> ModelType:
+        self,
+        db: Session,
+        id: Any,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+        expected_version: Optional[int] = None,
+    ) -> Optional[ModelType]:
         """
-        Update a model.
+        Update a model in a single ``UPDATE ... RETURNING`` round trip.
 
         Args:
             db: The database session.
-            db_obj: The model to update.
-            obj_in: The updated model.
+            id: The id of the model to update.
+            obj_in: The new values. A dictionary is applied as is; for a
+                schema, None values are skipped.
+            expected_version: The version the model must still have, for an
+                optimistic update.
 
         Returns:
-            The updated model.
+            The updated model, or None if there is no active model with
+            this id.
+
+        Raises:
+            VersionConflictError: If the model has another version.
         """
-        if isinstance(obj_in, Base):
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        elif isinstance(obj_in, Base):
             update_data = obj_in.model_dump(exclude_unset=True)
         else:
             update_data = {
@@ -112,33 +380,527 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 for key, value in obj_in.__dict__.items()
                 if value is not None
             }
+        return self._write(db, id, update_data, expected_version)
 
-        obj_data = jsonable_encoder(db_obj)
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
-
-    def delete(self, db: Session, id: Any) -> ModelType:
+    def delete(
+        self, db: Session, id: Any, expected_version: Optional[int] = None
+    ) -> Optional[ModelType]:
         """
         Delete a model.
 
         Args:
             db: The database session.
             id: The id of the model to remove.
+            expected_version: The version the model must still have, for an
+                optimistic delete.
 
         Returns:
-            The removed model.
+            The removed model, or None if there is no active model with this
+            id.
+
+        Raises:
+            VersionConflictError: If the model has another version.
         """
-        statement = select(self.model).where(self.model.id == id)
-        db_obj = db.exec(statement).one_or_none()
-        if not db_obj:
-            return None
-        db_obj.is_active = False
-        db.add(db_obj)
+        return self._write(db, id, {"is_active": False}, expected_version)
+
+    def _write(
+        self,
+        db: Session,
+        id: Any,
+        values: Dict[str, Any],
+        expected_version: Optional[int],
+    ) -> Optional[ModelType]:
+        """
+        Write to an active model with one conditional UPDATE, which also
+        bumps its version and update date, and commit.
+
+        With an expected version, a concurrent write makes the UPDATE match
+        no row instead of waiting on a lock.
+        """
+        condition = [
+            self.model.id == id,
+            self.model.is_active == True,  # noqa E712
+        ]
+        if expected_version is not None:
+            condition.append(self.model.version == expected_version)
+        db_obj = self._update(db, id, condition, values)
         db.commit()
-        db.refresh(db_obj)
+        self._invalidate([id])
+
+        if db_obj is None and expected_version is not None:
+            # Only a failed write pays for telling a conflict from a miss.
+            version = db.exec(
+                select(self.model.version).where(*condition[:2])
+            ).one_or_none()
+            if version is not None:
+                raise VersionConflictError(id, expected_version, version)
         return db_obj
+
+    def _update(
+        self,
+        db: Session,
+        id: Any,
+        condition: List[ColumnElement[bool]],
+        values: Dict[str, Any],
+    ) -> Optional[ModelType]:
+        """
+        Run the UPDATE of ``_write`` and ``bulk_update`` without committing.
+
+        The version is incremented by the database, so a write committed
+        concurrently is never overwritten with the same version. Dialects
+        without RETURNING read the row back after the UPDATE, in the same
+        transaction.
+
+        Without values nothing is written, and the matching model is returned
+        as it is, keeping its version.
+
+        Returns:
+            The written model, or None if no row matched ``condition``.
+        """
+        if not values:
+            return db.exec(
+                select(self.model)
+                .where(*condition)
+                .execution_options(populate_existing=True)
+            ).one_or_none()
+        statement = (
+            update(self.model)
+            .where(*condition)
+            .values(
+                {
+                    **values,
+                    "version": self.model.version + 1,
+                    "date_updated": utcnow(),
+                }
+            )
+            # Overwrite the copy of the model the session may already hold.
+            .execution_options(
+                synchronize_session=False, populate_existing=True
+            )
+        )
+        if db.get_bind().dialect.update_returning:
+            statement = statement.returning(self.model)
+            return db.exec(statement).scalars().one_or_none()
+        if not db.exec(statement).rowcount:
+            return None
+        return db.exec(
+            select(self.model)
+            .where(self.model.id == id)
+            .execution_options(populate_existing=True)
+        ).one()
+
+    def purge(
+        self,
+        db: Session,
+        ids: List[Any],
+        archive_model: Optional[Type[SQLModel]] = None,
+        condition: Optional[ColumnElement[bool]] = None,
+    ) -> int:
+        """
+        Remove models from the table for good, in a single transaction.
+
+        Args:
+            db: The database session.
+            ids: The ids of the models to remove.
+            archive_model: The model of an archive table with the same
+                columns plus ``archived_at``. The rows are copied to it
+                before they are removed. Without it they are just deleted.
+            condition: A condition the rows must still match to be removed,
+                so rows changed since their ids were selected are kept.
+
+        Returns:
+            The number of models removed.
+        """
+        table = self.model.__table__
+        criteria = [table.c.id.in_(ids)]
+        if condition is not None:
+            criteria.append(condition)
+        if archive_model is not None:
+            names = [column.name for column in table.columns]
+            rows = select(*table.columns, literal(utcnow())).where(*criteria)
+            db.exec(
+                insert(archive_model).from_select([*names, "archived_at"], rows)
+            )
+        removed = db.exec(delete(table).where(*criteria)).rowcount
+        db.commit()
+        self._invalidate(ids)
+        return removed
+
+    def _column(self, name: str) -> Column:
+        """
+        Get a column of the model's table by name.
+
+        Raises:
+            ValueError: If the table has no such column.
+        """
+        column = self.model.__table__.columns.get(name)
+        if column is None:
+            raise ValueError(f"Unknown column: {name}")
+        return column
+
+    def _criteria(
+        self,
+        filters: Optional[Dict[str, Any]],
+        prefixes: Optional[Dict[str, str]],
+    ) -> List[ColumnElement[bool]]:
+        """
+        Build the WHERE criteria of the ``filters`` and ``prefixes`` arguments.
+        """
+        criteria = [
+            self._column(name) == value
+            for name, value in (filters or {}).items()
+        ]
+        # autoescape keeps % and _ in the prefix from acting as wildcards.
+        criteria += [
+            self._column(name).startswith(prefix, autoescape=True)
+            for name, prefix in (prefixes or {}).items()
+        ]
+        return criteria
+
+    def _cache_key(self, id: Any) -> str:
+        """
+        Get the cache key of a model.
+        """
+        return f"{self.model.__tablename__}:{id}"
+
+    def _caches_reads(self, db: Session) -> bool:
+        """
+        Whether the rows read by a session may fill the cache.
+
+        Rows read from a replica may be older than the primary, and caching
+        them would serve them to the clients reading their own writes.
+        """
+        if self.cache is None:
+            return False
+        return not (isinstance(db, RoutingSession) and db.reads_from_replicas)
+
+    def _from_cache(self, db: Session, data: Dict[str, Any]) -> ModelType:
+        """
+        Attach a cached model to the session without loading it again.
+        """
+        db_obj = self.model(**data)
+        make_transient_to_detached(db_obj)
+        return db.merge(db_obj, load=False)
+
+    def _fill_cache(self, db_obj: ModelType, started: int):
+        """
+        Cache a model read from the database, unless it was invalidated since
+        the read started, in which case the row read may predate the write.
+
+        Args:
+            db_obj: The model read.
+            started: The number of invalidations when the read started.
+        """
+        key = self._cache_key(db_obj.id)
+        # The check and the write happen under the lock, so an invalidation
+        # either is seen here or deletes the value afterwards.
+        with self._invalidation_lock:
+            invalidated = self._invalidated.get(key, self._forgotten)
+            if invalidated <= started:
+                self.cache.set(key, db_obj.model_dump())
+
+    def _invalidate(self, ids: List[Any]):
+        """
+        Remove models from the cache after they have been written.
+        """
+        if self.cache is None:
+            return
+        keys = [self._cache_key(id) for id in ids]
+        with self._invalidation_lock:
+            self._invalidations += 1
+            for key in keys:
+                self._invalidated[key] = self._invalidations
+                self._invalidated.move_to_end(key)
+            while len(self._invalidated) > TRACKED_INVALIDATIONS:
+                # Reads older than a forgotten invalidation aren't cached.
+                _, self._forgotten = self._invalidated.popitem(last=False)
+        for key in keys:
+            self.cache.delete(key)
+
+    def stream(
+        self,
+        db: Session,
+        alive_only: bool = True,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> Iterator[List[RowMapping]]:
+        """
+        Stream the rows of every model through a server-side cursor.
+
+        Rows are plain column mappings, not ORM objects, and only
+        ``batch_size`` of them are held in memory at a time.
+
+        Args:
+            db: The database session.
+            alive_only: Whether to skip soft-deleted models.
+            batch_size: The number of rows fetched per round trip.
+
+        Yields:
+            Lists of at most ``batch_size`` rows.
+        """
+        statement = self._stream_statement(alive_only, batch_size)
+        yield from db.exec(statement).mappings().partitions()
+
+    async def astream(
+        self,
+        db: AsyncSession,
+        alive_only: bool = True,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[List[RowMapping]]:
+        """
+        Stream the rows of every model using an async session.
+        """
+        statement = self._stream_statement(alive_only, batch_size)
+        result = await db.stream(statement)
+        async for partition in result.mappings().partitions():
+            yield partition
+
+    def _stream_statement(self, alive_only: bool, batch_size: int):
+        """
+        Build the statement used by ``stream`` and ``astream``.
+        """
+        table = self.model.__table__
+        statement = select(*table.columns)
+        if alive_only:
+            statement = statement.where(self.model.is_active == True)  # noqa E712
+        return statement.order_by(
+            self.model.date_created, self.model.id
+        ).execution_options(yield_per=batch_size)
+
+    def bulk_create(
+        self,
+        db: Session,
+        objs_in: List[CreateSchemaType],
+        chunk_size: int = BULK_CHUNK_SIZE,
+    ) -> Dict[str, List[Any]]:
+        """
+        Create many models in a single transaction.
+
+        Rows are sent as multi-row INSERTs of ``chunk_size`` rows, with
+        RETURNING when the dialect supports it.
+
+        Args:
+            db: The database session.
+            objs_in: The models to create.
+            chunk_size: The number of rows per INSERT statement.
+
+        Returns:
+            The created models and the per-item errors.
+        """
+        rows = [
+            self.model(**jsonable_encoder(obj_in)).model_dump()
+            for obj_in in objs_in
+        ]
+        returning = db.get_bind().dialect.insert_executemany_returning
+
+        created = []
+        for _, chunk in enumerate_chunks(rows, chunk_size):
+            statement = insert(self.model)
+            if returning:
+                statement = statement.returning(self.model)
+                created.extend(db.exec(statement, params=chunk).scalars())
+            else:
+                db.exec(statement, params=chunk)
+                created.extend(self.model(**row) for row in chunk)
+        db.commit()
+        return {"data": created, "errors": []}
+
+    def bulk_update(
+        self, db: Session, objs_in: List[Dict[str, Any]]
+    ) -> Dict[str, List[Any]]:
+        """
+        Update many models in a single transaction.
+
+        Each model is written with its own conditional UPDATE, like
+        ``update``, so none is written back from a copy read earlier.
+
+        Args:
+            db: The database session.
+            objs_in: The fields to set on each model, including its ``id``.
+
+        Returns:
+            The updated models and the per-item errors.
+        """
+        updated, errors = [], []
+        for index, obj_in in enumerate(objs_in):
+            id = obj_in["id"]
+            condition = [
+                self.model.id == id,
+                self.model.is_active == True,  # noqa E712
+            ]
+            values = {
+                field: value for field, value in obj_in.items() if field != "id"
+            }
+            db_obj = self._update(db, id, condition, values)
+            if db_obj is None:
+                errors.append(not_found_error(index, id))
+            else:
+                updated.append(db_obj)
+        db.commit()
+        self._invalidate([db_obj.id for db_obj in updated])
+        return {"data": updated, "errors": errors}
+
+    def bulk_delete(
+        self,
+        db: Session,
+        ids: List[Any],
+        chunk_size: int = BULK_CHUNK_SIZE,
+    ) -> Dict[str, List[Any]]:
+        """
+        Delete many models in a single transaction.
+
+        Each chunk is soft-deleted with one ``UPDATE ... WHERE id IN (...)``,
+        with RETURNING when the dialect supports it.
+
+        Args:
+            db: The database session.
+            ids: The ids of the models to remove.
+            chunk_size: The number of ids per UPDATE statement.
+
+        Returns:
+            The removed models and the per-item errors.
+        """
+        returning = db.get_bind().dialect.update_returning
+
+        deleted, errors = [], []
+        for start, chunk in enumerate_chunks(ids, chunk_size):
+            condition = (
+                self.model.id.in_(chunk),
+                self.model.is_active == True,  # noqa E712
+            )
+            now = utcnow()
+            statement = (
+                update(self.model)
+                .where(*condition)
+                .values(
+                    is_active=False,
+                    version=self.model.version + 1,
+                    date_updated=now,
+                )
+            )
+            if returning:
+                statement = statement.returning(self.model)
+                db_objs = db.exec(statement).scalars().all()
+            else:
+                db_objs = db.exec(select(self.model).where(*condition)).all()
+                db.exec(statement)
+                for db_obj in db_objs:
+                    set_committed_value(db_obj, "is_active", False)
+                    set_committed_value(db_obj, "version", db_obj.version + 1)
+                    set_committed_value(db_obj, "date_updated", now)
+
+            found = {db_obj.id for db_obj in db_objs}
+            deleted.extend(db_objs)
+            errors.extend(
+                not_found_error(index, id)
+                for index, id in enumerate(chunk, start)
+                if id not in found
+            )
+        db.commit()
+        self._invalidate([db_obj.id for db_obj in deleted])
+        return {"data": deleted, "errors": errors}
+
+    async def aget(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        """
+        Get a model by id using an async session.
+        """
+        return await db.run_sync(self.get, id)
+
+    async def aget_many(
+        self, db: AsyncSession, ids: List[Any]
+    ) -> List[Optional[ModelType]]:
+        """
+        Get many models by id using an async session.
+        """
+        return await db.run_sync(self.get_many, ids)
+
+    async def aall(
+        self,
+        db: AsyncSession,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        alive_only: bool = True,
+        approximate_total: bool = False,
+        **options: Any,
+    ) -> Dict[str, Any]:
+        """
+        Get a page of models using an async session.
+
+        The keyword ``options`` are the filtering, ordering and projection
+        arguments of ``all``.
+        """
+        return await db.run_sync(
+            self.all, limit, cursor, alive_only, approximate_total, **options
+        )
+
+    async def acount(
+        self,
+        db: AsyncSession,
+        alive_only: bool = True,
+        approximate: bool = False,
+        filters: Optional[Dict[str, Any]] = None,
+        prefixes: Optional[Dict[str, str]] = None,
+    ) -> int:
+        """
+        Count the models using an async session.
+        """
+        return await db.run_sync(
+            self.count, alive_only, approximate, filters, prefixes
+        )
+
+    async def acreate(
+        self, db: AsyncSession, obj_in: CreateSchemaType
+    ) -> ModelType:
+        """
+        Create a new model using an async session.
+        """
+        return await db.run_sync(self.create, obj_in)
+
+    async def aupdate(
+        self,
+        db: AsyncSession,
+        id: Any,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+        expected_version: Optional[int] = None,
+    ) -> Optional[ModelType]:
+        """
+        Update a model using an async session.
+        """
+        return await db.run_sync(self.update, id, obj_in, expected_version)
+
+    async def adelete(
+        self, db: AsyncSession, id: Any, expected_version: Optional[int] = None
+    ) -> Optional[ModelType]:
+        """
+        Delete a model using an async session.
+        """
+        return await db.run_sync(self.delete, id, expected_version)
+
+    async def abulk_create(
+        self,
+        db: AsyncSession,
+        objs_in: List[CreateSchemaType],
+        chunk_size: int = BULK_CHUNK_SIZE,
+    ) -> Dict[str, List[Any]]:
+        """
+        Create many models using an async session.
+        """
+        return await db.run_sync(self.bulk_create, objs_in, chunk_size)
+
+    async def abulk_update(
+        self, db: AsyncSession, objs_in: List[Dict[str, Any]]
+    ) -> Dict[str, List[Any]]:
+        """
+        Update many models using an async session.
+        """
+        return await db.run_sync(self.bulk_update, objs_in)
+
+    async def abulk_delete(
+        self,
+        db: AsyncSession,
+        ids: List[Any],
+        chunk_size: int = BULK_CHUNK_SIZE,
+    ) -> Dict[str, List[Any]]:
+        """
+        Delete many models using an async session.
+        """
+        return await db.run_sync(self.bulk_delete, ids, chunk_size)
@@ -0,0 +1,132 @@
+"""
+This file contains the cache backends used by the CRUD operations.
+"""
+
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class CacheBackend(ABC):
+    """
+    The interface every cache backend implements.
+
+    Values are plain dictionaries of column values, so a shared backend only
+    needs to know how to serialize them.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the value stored under ``key``, or None on a miss.
+        """
+
+    @abstractmethod
+    def set(self, key: str, value: Dict[str, Any]):
+        """
+        Store ``value`` under ``key``.
+        """
+
+    @abstractmethod
+    def delete(self, key: str):
+        """
+        Remove ``key`` from the cache.
+        """
+
+    @abstractmethod
+    def clear(self):
+        """
+        Remove every key from the cache.
+        """
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the hit, miss and eviction counters of the cache.
+        """
+
+
+class LRUCache(CacheBackend):
+    """
+    An in-process, thread-safe LRU cache whose entries expire after a TTL.
+
+    Attributes:
+        maxsize: The maximum number of entries kept.
+        ttl: The number of seconds an entry stays valid.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: The maximum number of entries kept.
+            ttl: The number of seconds an entry stays valid.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": type(self).__name__,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def get_default_cache() -> Optional[CacheBackend]:
+    """
+    Build the cache configured by ``CRUD_CACHE_SIZE`` and ``CRUD_CACHE_TTL``.
+
+    Returns:
+        An LRU cache, or None when ``CRUD_CACHE_SIZE`` is 0.
+    """
+    maxsize = int(os.getenv("CRUD_CACHE_SIZE", "1024"))
+    if maxsize <= 0:
+        return None
+    return LRUCache(maxsize, float(os.getenv("CRUD_CACHE_TTL", "60")))
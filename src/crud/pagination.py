@@ -0,0 +1,80 @@
+"""
+This file contains the helpers for keyset (cursor) pagination.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List
+from uuid import UUID
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """
+    Encode the ordering values of the last row of a page.
+
+    Args:
+        values: The values of the ordering columns, e.g. (date_created, id).
+
+    Returns:
+        An opaque url-safe token.
+    """
+    raw = json.dumps(
+        [
+            value.isoformat() if isinstance(value, datetime) else str(value)
+            for value in values
+        ]
+    ).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[str]:
+    """
+    Decode a token created with ``encode_cursor``.
+
+    Args:
+        cursor: The opaque token.
+
+    Returns:
+        The ordering values as strings: the sort column and the id.
+
+    Raises:
+        ValueError: If the token is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError) as error:
+        raise ValueError("Invalid cursor") from error
+    if (
+        not isinstance(values, list)
+        or len(values) != 2
+        or not all(isinstance(value, str) for value in values)
+    ):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def parse_cursor_value(python_type: type, value: str) -> Any:
+    """
+    Convert a value decoded from a cursor back to the type of its column.
+
+    Args:
+        python_type: The Python type of the column.
+        value: The value as stored in the cursor.
+
+    Returns:
+        The typed value.
+
+    Raises:
+        ValueError: If the value doesn't fit the type.
+    """
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is UUID:
+        return UUID(value)
+    if python_type is bool:
+        if value not in ("True", "False"):
+            raise ValueError(f"Invalid boolean: {value}")
+        return value == "True"
+    return python_type(value)
@@ -2,13 +2,84 @@
 This file contains the CRUD operations for the Todo.
 """
 
+from typing import Any, Dict
+
+from sqlalchemy import column, func, literal_column, table
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
 from crud.base import CRUDBase
+from crud.cache import get_default_cache
 from models.todo import Todo
 from schemas.todo import TodoCreate, TodoUpdate
 
+# The FTS5 table SQLite keeps in sync with todo (see migration 0004).
+todo_fts = table("todo_fts", column("rowid"))
+
+
+def fts_query(query: str) -> str:
+    """
+    Turn free text into an FTS5 query matching every word of it.
+
+    Each word is quoted, so characters such as ``-`` or ``"`` and words such
+    as ``OR`` are searched for instead of being read as FTS5 syntax.
+    """
+    return " ".join(
+        '"' + word.replace('"', '""') + '"' for word in query.split()
+    )
+
 
 class CRUDTodo(CRUDBase[Todo, TodoCreate, TodoUpdate]):
-    pass
+    def search(
+        self, db: Session, query: str, limit: int = 20, offset: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Search the title and description of the todos with the full-text
+        index, best matches first.
+
+        Args:
+            db: The database session.
+            query: The words to search for. Todos must match all of them.
+            limit: The maximum number of todos to return.
+            offset: The number of matching todos to skip.
+
+        Returns:
+            The total number of matches and the requested page of todos.
+        """
+        if not query.split():
+            return {"total": 0, "data": []}
+
+        if db.get_bind().dialect.name == "postgresql":
+            vector = literal_column("todo.search_vector")
+            ts_query = func.websearch_to_tsquery("english", query)
+            match = vector.op("@@")(ts_query)
+            statement = select(Todo).where(match)
+            rank = func.ts_rank(vector, ts_query).desc()
+        else:
+            match = literal_column("todo_fts").op("MATCH")(fts_query(query))
+            statement = (
+                select(Todo)
+                .join(
+                    todo_fts, todo_fts.c.rowid == literal_column("todo.rowid")
+                )
+                .where(match)
+            )
+            # Weigh the title over the description, like on Postgres.
+            rank = func.bm25(literal_column("todo_fts"), 2.0, 1.0)
+        statement = statement.where(Todo.is_active == True)  # noqa E712
+
+        total = db.exec(
+            select(func.count()).select_from(statement.subquery())
+        ).one()
+        data = db.exec(
+            statement.order_by(rank, Todo.id).limit(limit).offset(offset)
+        ).all()
+        return {"total": total, "data": data}
+
+    async def asearch(
+        self, db: AsyncSession, query: str, limit: int = 20, offset: int = 0
+    ) -> Dict[str, Any]:
+        return await db.run_sync(self.search, query, limit, offset)
 
 
-todo = CRUDTodo(Todo)
+todo = CRUDTodo(Todo, cache=get_default_cache())
@@ -2,12 +2,61 @@
 This file contains the GraphQL API for the application.
 """
 
+import os
+
 import strawberry
-from strawberry.fastapi import GraphQLRouter
+from strawberry.extensions import (
+    AddValidationRules,
+    MaxAliasesLimiter,
+    ParserCache,
+    QueryDepthLimiter,
+    ValidationCache,
+)
 
+from crud.cache import LRUCache
+from graphql_api.cost import max_cost_rule, max_variable_cost_extension
+from graphql_api.loaders import get_todo_loader
+from graphql_api.metrics import GraphQLMetrics
 from graphql_api.mutations import Mutation
-from graphql_api.queries import Query
+from graphql_api.persisted import PersistedQueryRouter
+from graphql_api.queries import MAX_PAGE_SIZE, Query
+
+DOCUMENT_CACHE_SIZE = int(os.getenv("GRAPHQL_DOCUMENT_CACHE_SIZE", "256"))
+PERSISTED_QUERIES_SIZE = int(
+    os.getenv("GRAPHQL_PERSISTED_QUERIES_SIZE", "1024")
+)
+MAX_DEPTH = int(os.getenv("GRAPHQL_MAX_DEPTH", "10"))
+MAX_ALIASES = int(os.getenv("GRAPHQL_MAX_ALIASES", "100"))
+MAX_COST = int(os.getenv("GRAPHQL_MAX_COST", "5000"))
+
+schema = strawberry.Schema(
+    query=Query,
+    mutation=Mutation,
+    extensions=[
+        # The limits run as validation rules, so expensive operations are
+        # rejected before any resolver runs, and the verdict is cached along
+        # with the parsed document.
+        QueryDepthLimiter(max_depth=MAX_DEPTH),
+        MaxAliasesLimiter(max_alias_count=MAX_ALIASES),
+        AddValidationRules([max_cost_rule(MAX_COST, MAX_PAGE_SIZE)]),
+        ParserCache(maxsize=DOCUMENT_CACHE_SIZE),
+        ValidationCache(maxsize=DOCUMENT_CACHE_SIZE),
+        # Limits passed as variables are only known at execution.
+        max_variable_cost_extension(MAX_COST, MAX_PAGE_SIZE),
+        GraphQLMetrics,
+    ],
+)
+
+
+async def get_context() -> dict:
+    """
+    Get the context shared by every resolver of a request.
+    """
+    return {"todo_loader": get_todo_loader()}
 
-schema = strawberry.Schema(query=Query, mutation=Mutation)
 
-graphql_router = GraphQLRouter(schema)
+graphql_router = PersistedQueryRouter(
+    schema,
+    context_getter=get_context,
+    persisted_queries=LRUCache(PERSISTED_QUERIES_SIZE, ttl=float("inf")),
+)
@@ -0,0 +1,255 @@
+"""
+This file contains the query cost limit for the GraphQL API.
+
+Operations are costed when they are validated, with their literal
+arguments, and the verdict is cached with the document. The page size of an
+operation passing its ``limit`` as a variable is only known once the
+variables are, so such operations are costed again before they execute.
+"""
+
+from typing import Any, Callable, Dict, Iterator, Optional, Set, Type
+
+from graphql import (
+    ExecutionResult,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLList,
+    GraphQLNonNull,
+    GraphQLSchema,
+    InlineFragmentNode,
+    IntValueNode,
+    ListValueNode,
+    OperationDefinitionNode,
+    SelectionSetNode,
+    ValidationRule,
+    VariableNode,
+    get_operation_ast,
+)
+from strawberry.extensions import SchemaExtension
+
+DEFAULT_LIST_SIZE = 100
+
+
+def get_list_size(
+    node: FieldNode,
+    field,
+    list_size: int,
+    variables: Optional[Dict[str, Any]] = None,
+    max_list_size: Optional[int] = None,
+) -> int:
+    """
+    Get the number of items the lists below a field are expected to hold.
+
+    A literal ``limit`` argument sets it, as does the length of a literal
+    ``ids`` list. A ``limit`` variable sets it once ``variables`` are known,
+    and counts as the default value of the argument until then. Limits are
+    cut to ``max_list_size``, as the resolvers do.
+    """
+    arguments = {
+        argument.name.value: argument.value for argument in node.arguments
+    }
+    limit = arguments.get("limit")
+    size = None
+    if isinstance(limit, IntValueNode):
+        size = int(limit.value)
+    elif isinstance(limit, VariableNode) and variables is not None:
+        value = variables.get(limit.name.value)
+        # Values that aren't integers are rejected when the operation runs.
+        size = value if isinstance(value, int) else max_list_size
+    elif "limit" in field.args:
+        default = field.args["limit"].default_value
+        size = default if isinstance(default, int) else list_size
+    if size is not None:
+        return size if max_list_size is None else min(size, max_list_size)
+    ids = arguments.get("ids")
+    if isinstance(ids, ListValueNode):
+        return len(ids.values)
+    return list_size
+
+
+def unwrap_type(type_):
+    """
+    Strip the non-null and list wrappers of a type.
+
+    Returns:
+        The named type and whether it was a list.
+    """
+    is_list = False
+    while isinstance(type_, (GraphQLNonNull, GraphQLList)):
+        is_list = is_list or isinstance(type_, GraphQLList)
+        type_ = type_.of_type
+    return type_, is_list
+
+
+class CostCounter:
+    """
+    Count the cost of an operation.
+
+    Every field costs 1, and the fields below a list are counted once per
+    expected item, so the cost approximates the number of values resolved.
+
+    Attributes:
+        schema: The schema the operation runs against.
+        get_fragment: Get a fragment definition of the document by name.
+        variables: The variables of the operation, if known.
+        max_list_size: The most items the resolvers return in a list.
+    """
+
+    def __init__(
+        self,
+        schema: GraphQLSchema,
+        get_fragment: Callable[[str], Optional[FragmentDefinitionNode]],
+        variables: Optional[Dict[str, Any]] = None,
+        max_list_size: Optional[int] = None,
+    ):
+        self.schema = schema
+        self.get_fragment = get_fragment
+        self.variables = variables
+        self.max_list_size = max_list_size
+
+    def operation_cost(self, node: OperationDefinitionNode) -> int:
+        """
+        Count the cost of an operation of the document.
+        """
+        root_type = self.schema.get_root_type(node.operation)
+        return self.selection_cost(
+            root_type, node.selection_set, DEFAULT_LIST_SIZE, set()
+        )
+
+    def selection_cost(
+        self,
+        parent_type,
+        selection_set: Optional[SelectionSetNode],
+        list_size: int,
+        fragments: Set[str],
+    ) -> int:
+        if selection_set is None or parent_type is None:
+            return 0
+        cost = 0
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                cost += self.field_cost(
+                    parent_type, selection, list_size, fragments
+                )
+            elif isinstance(selection, InlineFragmentNode):
+                type_ = parent_type
+                if selection.type_condition:
+                    type_ = self.schema.get_type(
+                        selection.type_condition.name.value
+                    )
+                cost += self.selection_cost(
+                    type_, selection.selection_set, list_size, fragments
+                )
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = self.get_fragment(name)
+                if fragment is None or name in fragments:
+                    continue
+                cost += self.selection_cost(
+                    self.schema.get_type(fragment.type_condition.name.value),
+                    fragment.selection_set,
+                    list_size,
+                    fragments | {name},
+                )
+        return cost
+
+    def field_cost(
+        self, parent_type, node: FieldNode, list_size: int, fragments
+    ) -> int:
+        field = getattr(parent_type, "fields", {}).get(node.name.value)
+        if field is None:
+            return 1
+        list_size = get_list_size(
+            node, field, list_size, self.variables, self.max_list_size
+        )
+        type_, is_list = unwrap_type(field.type)
+        children = self.selection_cost(
+            type_, node.selection_set, list_size, fragments
+        )
+        return 1 + (list_size if is_list else 1) * children
+
+
+def cost_error(node: OperationDefinitionNode, max_cost: int, cost: int):
+    """
+    Build the error of an operation above the maximum cost.
+    """
+    name = node.name.value if node.name else "anonymous"
+    return GraphQLError(
+        f"'{name}' exceeds maximum operation cost of {max_cost} ({cost})",
+        node,
+    )
+
+
+def max_cost_rule(
+    max_cost: int, max_list_size: Optional[int] = None
+) -> Type[ValidationRule]:
+    """
+    Build a validation rule rejecting operations above ``max_cost``, with
+    their ``limit`` variables at the default value of the argument.
+
+    Args:
+        max_cost: The maximum cost of a single operation.
+        max_list_size: The most items the resolvers return in a list.
+    """
+
+    class MaxCostRule(ValidationRule):
+        def enter_operation_definition(
+            self, node: OperationDefinitionNode, *_args
+        ):
+            counter = CostCounter(
+                self.context.schema,
+                self.context.get_fragment,
+                max_list_size=max_list_size,
+            )
+            cost = counter.operation_cost(node)
+            if cost > max_cost:
+                self.report_error(cost_error(node, max_cost, cost))
+
+    return MaxCostRule
+
+
+def max_variable_cost_extension(
+    max_cost: int, max_list_size: Optional[int] = None
+) -> Type[SchemaExtension]:
+    """
+    Build a schema extension rejecting operations above ``max_cost`` once
+    their variables are known, before any resolver runs.
+
+    Only operations declaring variables are costed again, as the others
+    were fully costed by ``max_cost_rule``.
+
+    Args:
+        max_cost: The maximum cost of a single operation.
+        max_list_size: The most items the resolvers return in a list.
+    """
+
+    class MaxVariableCost(SchemaExtension):
+        def on_execute(self) -> Iterator[None]:
+            context = self.execution_context
+            node = get_operation_ast(
+                context.graphql_document, context.operation_name
+            )
+            if node is not None and node.variable_definitions:
+                fragments = {
+                    definition.name.value: definition
+                    for definition in context.graphql_document.definitions
+                    if isinstance(definition, FragmentDefinitionNode)
+                }
+                counter = CostCounter(
+                    # As strawberry's ValidationCache reads it.
+                    context.schema._schema,
+                    fragments.get,
+                    context.variables or {},
+                    max_list_size,
+                )
+                cost = counter.operation_cost(node)
+                if cost > max_cost:
+                    # A result set before the execution replaces it.
+                    context.result = ExecutionResult(
+                        data=None, errors=[cost_error(node, max_cost, cost)]
+                    )
+            yield
+
+    return MaxVariableCost
@@ -0,0 +1,42 @@
+"""
+This file contains the lazily built GraphQL endpoint used in fast-boot mode.
+
+Importing strawberry and building the schema is the largest part of the
+startup time of the application. In fast-boot mode the GraphQL endpoint is
+served by this ASGI app instead, which only imports the GraphQL API when
+the first request reaches it.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter
+from fastapi.routing import APIRoute
+from starlette.responses import PlainTextResponse
+
+
+class LazyGraphQLApp:
+    """
+    An ASGI app building the GraphQL router on its first request.
+    """
+
+    def __init__(self):
+        self._router: Optional[APIRouter] = None
+
+    @property
+    def router(self) -> APIRouter:
+        """
+        Get the GraphQL router, importing it on first use.
+        """
+        if self._router is None:
+            from graphql_api.api import graphql_router
+
+            self._router = graphql_router
+        return self._router
+
+    async def __call__(self, scope, receive, send):
+        for route in self.router.routes:
+            if isinstance(route, APIRoute) and scope["method"] in route.methods:
+                await route.handle(scope, receive, send)
+                return
+        response = PlainTextResponse("Method Not Allowed", status_code=405)
+        await response(scope, receive, send)
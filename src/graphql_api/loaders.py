@@ -0,0 +1,24 @@
+"""
+This file contains the DataLoaders for the GraphQL API.
+"""
+
+from typing import List, Optional
+from uuid import UUID
+
+from strawberry.dataloader import DataLoader
+
+from config.database import async_session
+from crud.todo import todo as todo_crud
+from models.todo import Todo
+
+
+def get_todo_loader() -> DataLoader[UUID, Optional[Todo]]:
+    """
+    Get a loader that batches the Todo lookups of a request in one query.
+    """
+
+    async def load_todos(ids: List[UUID]) -> List[Optional[Todo]]:
+        async with async_session() as db:
+            return await todo_crud.aget_many(db, ids)
+
+    return DataLoader(load_fn=load_todos)
@@ -0,0 +1,91 @@
+"""
+This file contains the schema extension recording the Prometheus metrics of
+the GraphQL operations.
+
+It lives apart from ``monitoring.metrics`` so recording the HTTP metrics
+doesn't import strawberry, which fast-boot mode defers to the first GraphQL
+request.
+"""
+
+import threading
+import time
+from typing import Iterator, Set
+
+from graphql import OperationDefinitionNode
+from strawberry.extensions import SchemaExtension
+from strawberry.types import ExecutionContext
+
+from monitoring.metrics import GRAPHQL_LATENCY
+
+# Operation names are chosen by the clients, so only this many distinct ones
+# get their own series; the others are labelled "other".
+MAX_OPERATION_NAMES = 200
+
+_operation_names: Set[str] = set()
+_operation_names_lock = threading.Lock()
+
+
+def get_operation_label(context: ExecutionContext, valid: bool) -> str:
+    """
+    Get the ``operation`` label of an operation.
+
+    Args:
+        context: The execution context of the operation.
+        valid: Whether its document was parsed and validated.
+
+    Returns:
+        The operation name, if the document is valid and defines it.
+    """
+    if not valid:
+        return "invalid"
+    name = context.operation_name
+    if name is None:
+        return "anonymous"
+    names = {
+        definition.name.value
+        for definition in context.graphql_document.definitions
+        if isinstance(definition, OperationDefinitionNode) and definition.name
+    }
+    if name not in names:
+        return "invalid"
+    with _operation_names_lock:
+        if name not in _operation_names:
+            if len(_operation_names) >= MAX_OPERATION_NAMES:
+                return "other"
+            _operation_names.add(name)
+    return name
+
+
+class GraphQLMetrics(SchemaExtension):
+    """
+    A schema extension recording the latency of every GraphQL operation.
+    """
+
+    valid = False
+
+    def on_validate(self) -> Iterator[None]:
+        yield
+        self.valid = not self.execution_context.errors
+
+    def on_operation(self) -> Iterator[None]:
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except Exception:
+            # Parsing errors are raised through the extension.
+            failed = True
+            raise
+        finally:
+            context = self.execution_context
+            try:
+                operation_type = context.operation_type.value
+            except RuntimeError:
+                # The document couldn't be parsed.
+                operation_type = "unknown"
+            status = "error" if failed or context.errors else "ok"
+            GRAPHQL_LATENCY.labels(
+                get_operation_label(context, self.valid),
+                operation_type,
+                status,
+            ).observe(time.perf_counter() - start)
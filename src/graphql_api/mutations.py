@@ -6,12 +6,28 @@ from typing import Optional
 from uuid import UUID
 
 import strawberry
+from graphql import GraphQLError
 
-from config.database import get_db
+from config.database import async_session
+from crud.base import VersionConflictError
 from crud.todo import todo as todo_crud
 from graphql_api.schemas import TodoCreate, TodoType, TodoUpdate
 
 
+def conflict_error(error: VersionConflictError) -> GraphQLError:
+    """
+    Build the GraphQL error of a write on an outdated version of a Todo.
+    """
+    return GraphQLError(
+        "Todo has changed",
+        extensions={
+            "code": "CONFLICT",
+            "expectedVersion": error.expected,
+            "currentVersion": error.current,
+        },
+    )
+
+
 @strawberry.type
 class Mutation:
     """
@@ -19,36 +35,50 @@ class Mutation:
     """
 
     @strawberry.mutation
-    def create_todo(self, todo: TodoCreate) -> TodoType:
+    async def create_todo(self, todo: TodoCreate) -> TodoType:
         """
         Create a new Todo.
         """
-        db = get_db()
-        todo = todo_crud.create(db, todo)
+        async with async_session() as db:
+            todo = await todo_crud.acreate(db, todo)
         return todo
 
     @strawberry.mutation
-    def update_todo(
+    async def update_todo(
         self, todo_id: UUID, todo: TodoUpdate
     ) -> Optional[TodoType]:
         """
         Update a Todo.
+
+        With ``version``, the update fails with a CONFLICT error if the Todo
+        has been written to since that version.
         """
-        db = get_db()
-        db_obj = todo_crud.get(db, todo_id)
-        if not db_obj:
-            return None
-        todo = todo_crud.update(db, db_obj, todo)
+        update_data = {
+            key: value
+            for key, value in vars(todo).items()
+            if value is not None and key != "version"
+        }
+        async with async_session() as db:
+            try:
+                todo = await todo_crud.aupdate(
+                    db, todo_id, update_data, todo.version
+                )
+            except VersionConflictError as error:
+                raise conflict_error(error)
         return todo
 
     @strawberry.mutation
-    def delete_todo(self, todo_id: UUID) -> Optional[TodoType]:
+    async def delete_todo(
+        self, todo_id: UUID, version: Optional[int] = None
+    ) -> Optional[TodoType]:
         """
         Delete a Todo.
+
+        ``version`` works as for updateTodo.
         """
-        db = get_db()
-        db_obj = todo_crud.get(db, todo_id)
-        if not db_obj:
-            return None
-        todo = todo_crud.delete(db, todo_id)
+        async with async_session() as db:
+            try:
+                todo = await todo_crud.adelete(db, todo_id, version)
+            except VersionConflictError as error:
+                raise conflict_error(error)
         return todo
@@ -0,0 +1,91 @@
+"""
+This file contains the automatic persisted queries for the GraphQL API.
+
+Clients send the sha256 hash of a query in
+``extensions.persistedQuery.sha256Hash``. When the server doesn't know the
+hash it answers with a ``PersistedQueryNotFound`` error, and the client
+retries once with the full query, which is then stored under its hash.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from graphql import GraphQLError
+from strawberry.fastapi import GraphQLRouter
+from strawberry.http import GraphQLRequestData
+from strawberry.http.exceptions import HTTPException
+from strawberry.types import ExecutionResult
+
+from crud.cache import CacheBackend
+
+
+class PersistedQueryNotFound(Exception):
+    """
+    Raised when a client sends the hash of a query the server doesn't know.
+    """
+
+
+class PersistedQueryRouter(GraphQLRouter):
+    """
+    A GraphQL router that accepts automatic persisted queries.
+
+    Attributes:
+        persisted_queries: The store of queries by hash.
+    """
+
+    def __init__(self, *args, persisted_queries: CacheBackend, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.persisted_queries = persisted_queries
+
+    def should_render_graphql_ide(self, request) -> bool:
+        # A GET with only a hash is a persisted query, not a browser visit.
+        if request.query_params.get("extensions") is not None:
+            return False
+        return super().should_render_graphql_ide(request)
+
+    async def parse_http_body(self, request) -> GraphQLRequestData:
+        data = await super().parse_http_body(request)
+        persisted = (await self.get_extensions(request)).get("persistedQuery")
+        if not isinstance(persisted, dict):
+            return data
+
+        sha256 = persisted.get("sha256Hash")
+        if not isinstance(sha256, str):
+            raise HTTPException(400, "Missing persisted query hash")
+        key = f"apq:{sha256}"
+
+        if data.query is None:
+            stored = self.persisted_queries.get(key)
+            if stored is None:
+                raise PersistedQueryNotFound()
+            data.query = stored["query"]
+        else:
+            if hashlib.sha256(data.query.encode()).hexdigest() != sha256:
+                raise HTTPException(400, "Persisted query hash mismatch")
+            self.persisted_queries.set(key, {"query": data.query})
+        return data
+
+    async def get_extensions(self, request) -> Dict[str, Any]:
+        """
+        Read the ``extensions`` member of a GraphQL request.
+        """
+        raw: Optional[Any]
+        if request.method == "GET":
+            raw = request.query_params.get("extensions")
+            raw = json.loads(raw) if raw else None
+        elif "json" in (request.content_type or ""):
+            raw = self.parse_json(await request.get_body()).get("extensions")
+        else:
+            raw = None
+        return raw if isinstance(raw, dict) else {}
+
+    async def execute_operation(self, request, context, root_value):
+        try:
+            return await super().execute_operation(request, context, root_value)
+        except PersistedQueryNotFound:
+            error = GraphQLError(
+                "PersistedQueryNotFound",
+                extensions={"code": "PERSISTED_QUERY_NOT_FOUND"},
+            )
+            return ExecutionResult(data=None, errors=[error])
@@ -2,36 +2,78 @@
 This file contains the queries for the GraphQL API.
 """
 
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 import strawberry
 
-from config.database import get_db
+from config.database import async_session
 from crud.todo import todo as todo_crud
 from graphql_api.schemas import TodoAllType, TodoType
 
+MAX_PAGE_SIZE = 1000
+MAX_SEARCH_PAGE_SIZE = 100
+
 
 @strawberry.type
 class Query:
     @strawberry.field
-    def get_all_todos(self) -> TodoAllType:
+    async def get_all_todos(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        approximate_total: bool = False,
+    ) -> TodoAllType:
         """
-        Get all Todos.
+        Get a page of Todos.
+
+        ``approximateTotal`` returns the planner's estimate of the table size
+        on Postgres instead of counting, which includes the soft-deleted
+        Todos not purged yet.
         """
-        db = get_db()
-        response = todo_crud.all(db)
-        data = response["data"]
-        total = response["total"]
-        return TodoAllType(data=data, total=total)
+        # Root fields run concurrently, and an AsyncSession can't be shared
+        # between concurrent operations, so every field gets its own.
+        async with async_session() as db:
+            response = await todo_crud.aall(
+                db,
+                limit=min(max(limit, 1), MAX_PAGE_SIZE),
+                cursor=cursor,
+                approximate_total=approximate_total,
+            )
+        return TodoAllType(**response)
 
     @strawberry.field
-    def get_todo(self, todo_id: UUID) -> Optional[TodoType]:
+    async def get_todo(
+        self, info: strawberry.Info, todo_id: UUID
+    ) -> Optional[TodoType]:
         """
         Get a single Todo.
+
+        Lookups made by the fields of one request are batched in one query.
+        """
+        return await info.context["todo_loader"].load(todo_id)
+
+    @strawberry.field
+    async def get_todos(
+        self, info: strawberry.Info, ids: List[UUID]
+    ) -> List[Optional[TodoType]]:
+        """
+        Get many Todos by id, with null for the missing ones.
+        """
+        return await info.context["todo_loader"].load_many(ids)
+
+    @strawberry.field
+    async def search_todos(
+        self, query: str, limit: int = 20, offset: int = 0
+    ) -> TodoAllType:
+        """
+        Search the title and description of the Todos, best matches first.
         """
-        db = get_db()
-        todo = todo_crud.get(db, todo_id)
-        if not todo:
-            return None
-        return todo
+        async with async_session() as db:
+            response = await todo_crud.asearch(
+                db,
+                query,
+                limit=min(max(limit, 1), MAX_SEARCH_PAGE_SIZE),
+                offset=max(offset, 0),
+            )
+        return TodoAllType(**response)
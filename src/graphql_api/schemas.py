@@ -14,12 +14,14 @@ class TodoType:
     title: str
     description: str
     is_completed: bool
+    version: int
 
 
 @strawberry.type
 class TodoAllType:
     data: List[TodoType]
     total: int
+    next_cursor: Optional[str] = None
 
 
 @strawberry.input
@@ -33,3 +35,4 @@ class TodoUpdate:
     title: Optional[str]
     description: Optional[str]
     is_completed: bool = False
+    version: Optional[int] = None
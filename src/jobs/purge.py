@@ -0,0 +1,245 @@
+"""
+This file contains the job purging dead todos from the todo table.
+
+Soft-deleted todos, and todos completed more than a number of days ago,
+are moved to the todo_archive table, or deleted for good. The work is done
+in small batches, each in its own short transaction, so the job never holds
+locks on the todo table for long.
+
+Run it once with:
+
+    PYTHONPATH=src python -m jobs.purge --completed-days 30
+
+or set ``PURGE_INTERVAL`` to run it periodically inside the application.
+"""
+
+import argparse
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import ColumnElement
+from sqlmodel import Session, select
+
+from config.database import engine
+from crud.todo import todo as todo_crud
+from models.base import utcnow
+from models.todo import Todo, TodoArchive
+
+
+class PurgeJob:
+    """
+    Purges dead todos in batches and keeps counters of its progress.
+
+    Attributes:
+        archive: Whether todos are moved to todo_archive instead of deleted.
+        completed_days: How many days after their last update completed
+            todos are purged, or None to keep them.
+        batch_size: The number of todos removed per transaction.
+        pause: The number of seconds to wait between batches.
+    """
+
+    def __init__(
+        self,
+        archive: bool = True,
+        completed_days: Optional[int] = 30,
+        batch_size: int = 500,
+        pause: float = 0.0,
+    ):
+        """
+        Initialize the job.
+
+        Args:
+            archive: Whether todos are moved to todo_archive instead of
+                deleted.
+            completed_days: How many days after their last update completed
+                todos are purged, or None to keep them.
+            batch_size: The number of todos removed per transaction.
+            pause: The number of seconds to wait between batches.
+        """
+        self.archive = archive
+        self.completed_days = completed_days
+        self.batch_size = batch_size
+        self.pause = pause
+        self._lock = threading.Lock()
+        self.running = False
+        self.runs = 0
+        self.batches = 0
+        self.purged = 0
+        self.last_started_at: Optional[datetime] = None
+        self.last_finished_at: Optional[datetime] = None
+        self.last_purged = 0
+        self.last_error: Optional[str] = None
+
+    def conditions(self) -> List[ColumnElement[bool]]:
+        """
+        Get the conditions selecting the todos to purge, one per pass.
+
+        Each one is served by a partial index holding only matching rows.
+        """
+        conditions = [Todo.is_active == False]  # noqa E712
+        if self.completed_days is not None:
+            cutoff = utcnow() - timedelta(days=self.completed_days)
+            conditions.append(
+                (Todo.is_active == True)  # noqa E712
+                & (Todo.is_completed == True)  # noqa E712
+                & (Todo.date_updated < cutoff)
+            )
+        return conditions
+
+    def run(self, max_batches: Optional[int] = None) -> int:
+        """
+        Purge the dead todos.
+
+        Args:
+            max_batches: The maximum number of batches to purge in this run.
+
+        Returns:
+            The number of todos purged.
+
+        Raises:
+            RuntimeError: If the job is already running.
+        """
+        with self._lock:
+            if self.running:
+                raise RuntimeError("The purge job is already running")
+            self.running = True
+            self.runs += 1
+            self.last_started_at = utcnow()
+            self.last_purged = 0
+            self.last_error = None
+
+        archive_model = TodoArchive if self.archive else None
+        batches = 0
+        try:
+            for condition in self.conditions():
+                while max_batches is None or batches < max_batches:
+                    with Session(engine) as db:
+                        ids = db.exec(
+                            select(Todo.id)
+                            .where(condition)
+                            .limit(self.batch_size)
+                        ).all()
+                        if not ids:
+                            break
+                        # Checked again as the todos may have changed since.
+                        purged = todo_crud.purge(
+                            db, ids, archive_model, condition
+                        )
+                    batches += 1
+                    with self._lock:
+                        self.batches += 1
+                        self.purged += purged
+                        self.last_purged += purged
+                    if self.pause:
+                        time.sleep(self.pause)
+        except Exception as error:
+            with self._lock:
+                self.last_error = repr(error)
+            raise
+        finally:
+            with self._lock:
+                self.running = False
+                self.last_finished_at = utcnow()
+        return self.last_purged
+
+    async def schedule(self, interval: float):
+        """
+        Run the job every ``interval`` seconds, off the event loop, until
+        cancelled. A failed run is recorded in ``last_error`` and retried at
+        the next interval.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.run)
+            except Exception:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the progress counters of the job.
+        """
+        with self._lock:
+            return {
+                "mode": "archive" if self.archive else "delete",
+                "completed_days": self.completed_days,
+                "batch_size": self.batch_size,
+                "running": self.running,
+                "runs": self.runs,
+                "batches": self.batches,
+                "purged": self.purged,
+                "last_started_at": self.last_started_at,
+                "last_finished_at": self.last_finished_at,
+                "last_purged": self.last_purged,
+                "last_error": self.last_error,
+            }
+
+
+def get_completed_days(value: str) -> Optional[int]:
+    """
+    Parse a number of days, where a negative one disables the purge of
+    completed todos.
+    """
+    days = int(value)
+    return days if days >= 0 else None
+
+
+def get_default_purge_job() -> PurgeJob:
+    """
+    Build the job configured by ``PURGE_MODE``, ``PURGE_COMPLETED_DAYS``,
+    ``PURGE_BATCH_SIZE`` and ``PURGE_PAUSE``.
+    """
+    mode = os.getenv("PURGE_MODE", "archive")
+    if mode not in ("archive", "delete"):
+        raise ValueError(f"Unknown PURGE_MODE: {mode}")
+    return PurgeJob(
+        archive=mode == "archive",
+        completed_days=get_completed_days(
+            os.getenv("PURGE_COMPLETED_DAYS", "30")
+        ),
+        batch_size=int(os.getenv("PURGE_BATCH_SIZE", "500")),
+        pause=float(os.getenv("PURGE_PAUSE", "0.05")),
+    )
+
+
+PURGE_INTERVAL = float(os.getenv("PURGE_INTERVAL", "0"))
+
+purge_job = get_default_purge_job()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--mode", choices=["archive", "delete"], default="archive"
+    )
+    parser.add_argument(
+        "--completed-days",
+        type=get_completed_days,
+        default=30,
+        help="purge todos completed this many days ago (negative: never)",
+    )
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--pause", type=float, default=0.05)
+    parser.add_argument("--max-batches", type=int, default=None)
+    args = parser.parse_args()
+
+    job = PurgeJob(
+        archive=args.mode == "archive",
+        completed_days=args.completed_days,
+        batch_size=args.batch_size,
+        pause=args.pause,
+    )
+    start = time.perf_counter()
+    purged = job.run(args.max_batches)
+    print(
+        f"Purged {purged} todos in {job.batches} batches "
+        f"({args.mode}, {time.perf_counter() - start:.1f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,33 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 from mangum import Mangum
 
-from config.database import init_db
-from router import api_router
+from config.database import (
+    async_engine,
+    async_read_engines,
+    engine,
+    init_db,
+    read_engines,
+)
+from config.replicas import ReadYourWritesMiddleware
+from jobs.purge import PURGE_INTERVAL, purge_job
+from monitoring.metrics import setup_metrics
+from router import FAST_BOOT, api_router
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db()
+    purge = None
+    if PURGE_INTERVAL > 0:
+        purge = asyncio.create_task(purge_job.schedule(PURGE_INTERVAL))
     yield
+    if purge is not None:
+        purge.cancel()
+        with suppress(asyncio.CancelledError):
+            await purge
 
 
 app = FastAPI(
@@ -21,6 +38,20 @@ app = FastAPI(
 )
 
 app.include_router(api_router, prefix="/api")
+if read_engines:
+    app.add_middleware(ReadYourWritesMiddleware)
+setup_metrics(
+    app,
+    {
+        "sync": engine,
+        "async": async_engine.sync_engine,
+        **{f"sync_read{i}": e for i, e in enumerate(read_engines)},
+        **{
+            f"async_read{i}": e.sync_engine
+            for i, e in enumerate(async_read_engines)
+        },
+    },
+)
 
 
 @app.get("/")
@@ -28,4 +59,5 @@ def root():
     return {"message": "Go to /docs"}
 
 
-handler = Mangum(app)
+# In fast-boot mode the migrations run as a deploy step, not on cold start.
+handler = Mangum(app, lifespan="off" if FAST_BOOT else "auto")
@@ -0,0 +1,137 @@
+"""
+This file contains the runner applying the versioned schema migrations.
+
+Migrations live in ``migrations/versions`` as ``<version>_<name>.py``
+modules exposing an ``upgrade(connection)`` function. The versions already
+applied are recorded in the ``schema_version`` table, so a boot with an
+up-to-date schema costs one small query and no reflection.
+"""
+
+import importlib
+import pkgutil
+from contextlib import contextmanager
+from pathlib import Path
+from types import ModuleType
+from typing import Iterator, List, NamedTuple
+
+from sqlalchemy import Connection, Engine, text
+
+from models.base import utcnow
+
+VERSIONS_PATH = Path(__file__).parent / "versions"
+# Arbitrary key of the Postgres advisory lock serializing concurrent boots.
+LOCK_KEY = 7_305_118_502
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    module: ModuleType
+
+
+def get_migrations() -> List[Migration]:
+    """
+    Get every migration, sorted by version.
+    """
+    migrations = []
+    for module_info in pkgutil.iter_modules([str(VERSIONS_PATH)]):
+        version, _, name = module_info.name.partition("_")
+        module = importlib.import_module(
+            f"migrations.versions.{module_info.name}"
+        )
+        migrations.append(Migration(int(version), name, module))
+    return sorted(migrations)
+
+
+@contextmanager
+def migration_transaction(engine: Engine) -> Iterator[Connection]:
+    """
+    Open the transaction the migrations run in, holding the lock that keeps
+    instances booting at the same time from applying them twice.
+
+    pysqlite commits on its own before every DDL statement, so on SQLite the
+    transaction is begun by hand with ``BEGIN IMMEDIATE``, which also takes
+    the write lock of the database until it ends. Postgres takes an advisory
+    lock instead.
+    """
+    if engine.dialect.name != "sqlite":
+        with engine.begin() as connection:
+            if connection.dialect.name == "postgresql":
+                connection.execute(
+                    text("SELECT pg_advisory_xact_lock(:key)"),
+                    {"key": LOCK_KEY},
+                )
+            yield connection
+        return
+
+    with engine.connect() as connection:
+        # Stop pysqlite from managing transactions, so it sends ours as is.
+        connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.exec_driver_sql("ROLLBACK")
+            raise
+        connection.exec_driver_sql("COMMIT")
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """
+    Apply the migrations the database hasn't seen yet.
+
+    Every pending migration runs in a single transaction together with its
+    ``schema_version`` row, so a failed one leaves no schema change behind.
+    Concurrent boots are serialized by ``migration_transaction``.
+
+    Args:
+        engine: The engine of the database to migrate.
+
+    Returns:
+        The versions that were applied.
+    """
+    applied = []
+    with migration_transaction(engine) as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE IF NOT EXISTS schema_version ("
+                "version INTEGER PRIMARY KEY, "
+                "name VARCHAR NOT NULL, "
+                "applied_at TIMESTAMP NOT NULL)"
+            )
+        )
+        current = connection.execute(
+            text("SELECT MAX(version) FROM schema_version")
+        ).scalar()
+
+        for migration in get_migrations():
+            if current is not None and migration.version <= current:
+                continue
+            migration.module.upgrade(connection)
+            connection.execute(
+                text(
+                    "INSERT INTO schema_version (version, name, applied_at) "
+                    "VALUES (:version, :name, :applied_at)"
+                ),
+                {
+                    "version": migration.version,
+                    "name": migration.name,
+                    "applied_at": utcnow(),
+                },
+            )
+            applied.append(migration.version)
+    return applied
+
+
+def main():
+    """
+    Apply the pending migrations to the database of ``DATABASE_URL``.
+    """
+    from config.database import engine
+
+    applied = run_migrations(engine)
+    print(f"Applied migrations: {applied}" if applied else "Up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""
+Create the todo table as it was first deployed.
+
+Databases created before migrations existed already have it, so the table
+is only created when it is missing.
+"""
+
+from sqlalchemy import Boolean, Column, MetaData, String, Table, Uuid
+
+
+def upgrade(connection):
+    metadata = MetaData()
+    Table(
+        "todo",
+        metadata,
+        Column("id", Uuid, primary_key=True, index=True),
+        Column("is_active", Boolean, nullable=False),
+        Column("title", String, nullable=False),
+        Column("description", String),
+        Column("is_completed", Boolean, nullable=False),
+    )
+    metadata.create_all(connection, checkfirst=True)
@@ -0,0 +1,40 @@
+"""
+Add the date_created, date_updated and version columns to todo.
+
+Existing rows are stamped with the time of the migration.
+"""
+
+from sqlalchemy import DateTime, Integer, inspect, text
+
+from models.base import utcnow
+
+
+def upgrade(connection):
+    existing = {
+        column["name"] for column in inspect(connection).get_columns("todo")
+    }
+    datetime_type = DateTime().compile(dialect=connection.dialect)
+    integer_type = Integer().compile(dialect=connection.dialect)
+
+    for name in ("date_created", "date_updated"):
+        if name in existing:
+            continue
+        # SQLite can't add a NOT NULL column without a constant default.
+        connection.execute(
+            text(f"ALTER TABLE todo ADD COLUMN {name} {datetime_type}")
+        )
+        connection.execute(
+            text(f"UPDATE todo SET {name} = :now"), {"now": utcnow()}
+        )
+        if connection.dialect.name == "postgresql":
+            connection.execute(
+                text(f"ALTER TABLE todo ALTER COLUMN {name} SET NOT NULL")
+            )
+
+    if "version" not in existing:
+        connection.execute(
+            text(
+                f"ALTER TABLE todo ADD COLUMN version {integer_type} "
+                "NOT NULL DEFAULT 1"
+            )
+        )
@@ -0,0 +1,52 @@
+"""
+Add the full-text index over the title and description of todos.
+
+On Postgres it is a generated tsvector column with a GIN index. On SQLite
+it is an FTS5 table using todo as its external content, keyed on the rowid
+and kept in sync by triggers, so every write path updates it, bulk ones
+included. SQLite may renumber rowids on VACUUM, so run
+``INSERT INTO todo_fts(todo_fts) VALUES ('rebuild')`` after one.
+"""
+
+from sqlalchemy import text
+
+POSTGRES = [
+    "ALTER TABLE todo ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+    ") STORED",
+    "CREATE INDEX IF NOT EXISTS ix_todo_search_vector "
+    "ON todo USING GIN (search_vector)",
+]
+
+SQLITE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS todo_fts USING fts5("
+    "title, description, content='todo', content_rowid='rowid', "
+    "tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS todo_fts_insert AFTER INSERT ON todo BEGIN "
+    "INSERT INTO todo_fts (rowid, title, description) "
+    "VALUES (new.rowid, new.title, new.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS todo_fts_delete AFTER DELETE ON todo BEGIN "
+    "INSERT INTO todo_fts (todo_fts, rowid, title, description) "
+    "VALUES ('delete', old.rowid, old.title, old.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS todo_fts_update "
+    "AFTER UPDATE OF title, description ON todo BEGIN "
+    "INSERT INTO todo_fts (todo_fts, rowid, title, description) "
+    "VALUES ('delete', old.rowid, old.title, old.description); "
+    "INSERT INTO todo_fts (rowid, title, description) "
+    "VALUES (new.rowid, new.title, new.description); "
+    "END",
+    "INSERT INTO todo_fts (todo_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade(connection):
+    if connection.dialect.name == "postgresql":
+        statements = POSTGRES
+    else:
+        statements = SQLITE
+    for statement in statements:
+        connection.execute(text(statement))
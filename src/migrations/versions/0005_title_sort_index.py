@@ -0,0 +1,18 @@
+"""
+Index active todos by title, for the title sort order of the list.
+"""
+
+from sqlalchemy import text
+
+
+def upgrade(connection):
+    if connection.dialect.name == "postgresql":
+        predicate = "is_active"
+    else:
+        predicate = "is_active = 1"
+    connection.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_todo_active_title "
+            f"ON todo (title, id) WHERE {predicate}"
+        )
+    )
@@ -0,0 +1,55 @@
+"""
+Add the todo_archive table and the indexes the purge job selects with.
+
+The partial indexes only hold soft-deleted and completed rows, so finding
+the next batch to purge doesn't scan the live ones.
+"""
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Uuid,
+    text,
+)
+
+INDEXES = {
+    "ix_todo_inactive": ("(id)", "is_active = 0", "NOT is_active"),
+    "ix_todo_completed_updated": (
+        "(date_updated)",
+        "is_active = 1 AND is_completed = 1",
+        "is_active AND is_completed",
+    ),
+}
+
+
+def upgrade(connection):
+    metadata = MetaData()
+    Table(
+        "todo_archive",
+        metadata,
+        Column("id", Uuid, primary_key=True),
+        Column("is_active", Boolean, nullable=False),
+        Column("date_created", DateTime, nullable=False),
+        Column("date_updated", DateTime, nullable=False),
+        Column("version", Integer, nullable=False),
+        Column("title", String, nullable=False),
+        Column("description", String),
+        Column("is_completed", Boolean, nullable=False),
+        Column("archived_at", DateTime, nullable=False),
+    )
+    metadata.create_all(connection, checkfirst=True)
+
+    postgres = connection.dialect.name == "postgresql"
+    for name, (columns, sqlite_where, postgres_where) in INDEXES.items():
+        predicate = postgres_where if postgres else sqlite_where
+        connection.execute(
+            text(
+                f"CREATE INDEX IF NOT EXISTS {name} ON todo {columns} "
+                f"WHERE {predicate}"
+            )
+        )
@@ -2,20 +2,35 @@
 This is a base class for all models
 """
 
-from uuid import UUID, uuid4
+from datetime import datetime, timezone
+from uuid import UUID
 
 from sqlmodel import Field, SQLModel
 
+from models.ids import new_id
+
+
+def utcnow() -> datetime:
+    """
+    Get the current naive UTC datetime.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
 
 class Base(SQLModel):
     """
     Base class for all models
 
     Attributes:
-        id: UUID
+        id: UUID, time-ordered (v7) unless ID_STRATEGY says otherwise
         is_active: bool
         date_created: datetime
+        date_updated: datetime
+        version: int, incremented on every write
     """
 
-    id: UUID = Field(default_factory=uuid4, primary_key=True, index=True)
+    id: UUID = Field(default_factory=new_id, primary_key=True)
     is_active: bool = Field(default=True)
+    date_created: datetime = Field(default_factory=utcnow)
+    date_updated: datetime = Field(default_factory=utcnow)
+    version: int = Field(default=1)
@@ -0,0 +1,71 @@
+"""
+This file contains the primary key strategies for the models.
+"""
+
+import os
+import secrets
+import threading
+import time
+from typing import Callable, Dict
+from uuid import UUID, uuid4
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7() -> UUID:
+    """
+    Generate a time-ordered UUID version 7 (RFC 9562).
+
+    The first 48 bits are the Unix time in milliseconds, so new ids land at
+    the right edge of a primary key index instead of at random pages. The
+    next 12 bits are a counter that keeps ids generated in the same
+    millisecond ordered, and the last 62 bits are random.
+    """
+    global _last_ms, _counter
+
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            _last_ms = ms
+            # Start low enough that the counter rarely overflows.
+            _counter = secrets.randbits(11)
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                _last_ms += 1
+                _counter = 0
+        ms, counter = _last_ms, _counter
+
+    value = (ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76
+    value |= counter << 64
+    value |= 0b10 << 62
+    value |= secrets.randbits(62)
+    return UUID(int=value)
+
+
+ID_STRATEGIES: Dict[str, Callable[[], UUID]] = {
+    "uuid7": uuid7,
+    "uuid4": uuid4,
+}
+
+
+def get_id_factory() -> Callable[[], UUID]:
+    """
+    Get the id factory selected by ``ID_STRATEGY`` (``uuid7`` by default).
+
+    Both strategies produce UUIDs, so existing ids stay valid whichever one
+    is used.
+    """
+    strategy = os.getenv("ID_STRATEGY", "uuid7")
+    if strategy not in ID_STRATEGIES:
+        raise ValueError(
+            f"Unknown ID_STRATEGY {strategy!r}, "
+            f"expected one of {', '.join(ID_STRATEGIES)}"
+        )
+    return ID_STRATEGIES[strategy]
+
+
+new_id = get_id_factory()
@@ -2,11 +2,13 @@
 This file contains model definitions for the Todo.
 """
 
+from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import Index, text
 from sqlmodel import Field
 
-from models.base import Base
+from models.base import Base, utcnow
 
 
 class Todo(Base, table=True):
@@ -17,11 +19,77 @@ class Todo(Base, table=True):
         id: UUID
         is_active: bool
         date_created: datetime
+        date_updated: datetime
+        version: int
         title: str
         description: Optional[str]
         is_completed: bool
     """
 
+    # Mirrors the indexes created by the migrations.
+    __table_args__ = (
+        Index(
+            "ix_todo_active_created",
+            "date_created",
+            "id",
+            sqlite_where=text("is_active = 1"),
+            postgresql_where=text("is_active"),
+        ),
+        Index(
+            "ix_todo_active_completed_created",
+            "is_completed",
+            "date_created",
+            "id",
+            sqlite_where=text("is_active = 1"),
+            postgresql_where=text("is_active"),
+        ),
+        Index(
+            "ix_todo_active_title",
+            "title",
+            "id",
+            sqlite_where=text("is_active = 1"),
+            postgresql_where=text("is_active"),
+        ),
+        Index(
+            "ix_todo_inactive",
+            "id",
+            sqlite_where=text("is_active = 0"),
+            postgresql_where=text("NOT is_active"),
+        ),
+        Index(
+            "ix_todo_completed_updated",
+            "date_updated",
+            sqlite_where=text("is_active = 1 AND is_completed = 1"),
+            postgresql_where=text("is_active AND is_completed"),
+        ),
+    )
+
+    title: str
+    description: Optional[str] = None
+    is_completed: bool = Field(default=False)
+
+
+class TodoArchive(Base, table=True):
+    """
+    Todo Archive Model
+
+    The todos removed from the todo table by the purge job.
+
+    Attributes:
+        id: UUID
+        is_active: bool
+        date_created: datetime
+        date_updated: datetime
+        version: int
+        title: str
+        description: Optional[str]
+        is_completed: bool
+        archived_at: datetime
+    """
+
+    __tablename__ = "todo_archive"
+
     title: str
     description: Optional[str] = None
     is_completed: bool = Field(default=False)
+    archived_at: datetime = Field(default_factory=utcnow)
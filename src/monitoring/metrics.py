@@ -0,0 +1,187 @@
+"""
+This file contains the Prometheus metrics of the application.
+
+Requests are timed by an ASGI middleware, labelled with the route template
+rather than the raw path, and GraphQL operations by the schema extension in
+``graphql_api.metrics``, labelled with the name their document defines. Database
+statements are timed by cursor events on the engines, labelled with their
+verb, and the connection pool gauges are read when the metrics are scraped.
+Labels are kept to a bounded set of values, so recording a sample is a
+dictionary lookup and a histogram bucket increment.
+"""
+
+import time
+from typing import Dict
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    Counter,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy import Engine, event
+from starlette.requests import Request
+from starlette.responses import Response
+
+from config.database import get_bool_env, get_pool_status
+
+METRICS_ENABLED = get_bool_env("METRICS_ENABLED", True)
+SQL_VERBS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"}
+HTTP_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Latency of the HTTP requests by route.",
+    ["method", "route", "status"],
+)
+GRAPHQL_LATENCY = Histogram(
+    "graphql_operation_duration_seconds",
+    "Latency of the GraphQL operations by operation name.",
+    ["operation", "type", "status"],
+)
+DB_LATENCY = Histogram(
+    "db_query_duration_seconds",
+    "Latency of the database statements by engine and verb.",
+    ["engine", "verb"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+DB_ROWS = Counter(
+    "db_rows_affected",
+    "Rows written by INSERT, UPDATE and DELETE statements.",
+    ["engine", "verb"],
+)
+
+
+class MetricsMiddleware:
+    """
+    An ASGI middleware recording the latency of every HTTP request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            method = scope["method"]
+            HTTP_LATENCY.labels(
+                method if method in HTTP_METHODS else "OTHER",
+                get_route(scope),
+                status,
+            ).observe(time.perf_counter() - start)
+
+
+def get_route(scope) -> str:
+    """
+    Get the route template a request matched, such as
+    ``/api/tasks/{todo_id}``, to label it with.
+
+    Requests that matched no route, such as 404s and trailing-slash
+    redirects, share the ``unmatched`` label rather than their raw path.
+    """
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    return "unmatched"
+
+
+def instrument_engine(engine: Engine, name: str):
+    """
+    Record the latency of the statements run by an engine, and the rows
+    they wrote.
+
+    Args:
+        engine: The engine, or the ``sync_engine`` of an async engine.
+        name: The value of the ``engine`` label.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, *args):
+        # A single value, as a failed statement never reaches the event
+        # below and statements don't nest on a connection.
+        conn.info["query_start"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, *args):
+        elapsed = time.perf_counter() - conn.info.pop("query_start")
+        words = statement[:16].split(None, 1)
+        verb = words[0].upper() if words else "OTHER"
+        if verb not in SQL_VERBS:
+            verb = "OTHER"
+        DB_LATENCY.labels(name, verb).observe(elapsed)
+        if verb in ("INSERT", "UPDATE", "DELETE") and cursor.rowcount > 0:
+            DB_ROWS.labels(name, verb).inc(cursor.rowcount)
+
+
+class PoolCollector(Collector):
+    """
+    Collects the connection pool gauges of engines when metrics are scraped.
+    """
+
+    def __init__(self, engines: Dict[str, Engine]):
+        self.engines = engines
+
+    def collect(self):
+        gauges = {
+            key: GaugeMetricFamily(
+                f"db_pool_{key}",
+                f"Connections {description} in the pool.",
+                labels=["engine"],
+            )
+            for key, description in (
+                ("size", "kept"),
+                ("checkedin", "idle"),
+                ("checkedout", "in use"),
+                ("overflow", "opened above the pool size"),
+            )
+        }
+        for name, engine in self.engines.items():
+            status = get_pool_status(engine.pool)
+            for key, gauge in gauges.items():
+                if isinstance(status.get(key), int):
+                    gauge.add_metric([name], status[key])
+        yield from gauges.values()
+
+
+def metrics(request: Request) -> Response:
+    """
+    Serve the metrics in the Prometheus text format.
+    """
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
+
+
+def setup_metrics(app, engines: Dict[str, Engine]):
+    """
+    Record the metrics of an application and serve them at ``/metrics``,
+    unless ``METRICS_ENABLED`` is off.
+
+    Args:
+        app: The FastAPI application.
+        engines: The engines to instrument, by label. Async engines are
+            given as their ``sync_engine``.
+    """
+    if not METRICS_ENABLED:
+        return
+    app.add_middleware(MetricsMiddleware)
+    # An API route sets scope["route"], so scrapes are labelled like the rest.
+    app.add_api_route("/metrics", metrics, include_in_schema=False)
+    for name, engine in engines.items():
+        instrument_engine(engine, name)
+    REGISTRY.register(PoolCollector(engines))
@@ -0,0 +1,69 @@
+"""
+This file contains the helpers to count the SQL statements an operation
+issues, e.g. to catch N+1 query regressions in tests.
+"""
+
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from sqlalchemy import Engine, event
+
+from config.database import (
+    async_engine,
+    async_read_engines,
+    engine,
+    read_engines,
+)
+
+
+class QueryCounter:
+    """
+    The statements recorded by ``count_queries``.
+
+    Attributes:
+        statements: The SQL of every statement, in execution order.
+    """
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        """
+        Get the number of statements recorded.
+        """
+        return len(self.statements)
+
+
+@contextmanager
+def count_queries(*engines: Engine) -> Iterator[QueryCounter]:
+    """
+    Record the statements executed on engines while the block runs.
+
+    Statements run by other threads on the same engines are recorded too.
+
+    Args:
+        engines: The engines to listen to, given as their ``sync_engine``
+            for async ones. Defaults to every engine of the application.
+
+    Yields:
+        The counter, filled as statements run.
+    """
+    engines = engines or (
+        engine,
+        async_engine.sync_engine,
+        *read_engines,
+        *(read_engine.sync_engine for read_engine in async_read_engines),
+    )
+    counter = QueryCounter()
+
+    def record(conn, cursor, statement, *args):
+        counter.statements.append(statement)
+
+    for target in engines:
+        event.listen(target, "before_cursor_execute", record)
+    try:
+        yield counter
+    finally:
+        for target in engines:
+            event.remove(target, "before_cursor_execute", record)
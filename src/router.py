@@ -4,8 +4,12 @@ This file contains the routers for the application.
 
 from fastapi import APIRouter
 
+from api.health import router as health_router
 from api.todo import router as todo_router
-from graphql_api.api import graphql_router
+from config.database import get_bool_env
+
+# Defer importing the GraphQL API until it is first used.
+FAST_BOOT = get_bool_env("FAST_BOOT", False)
 
 api_router = APIRouter()
 
@@ -16,7 +20,25 @@ api_router.include_router(
 )
 
 api_router.include_router(
-    graphql_router,
-    prefix="/graphql",
-    tags=["graphql"],
+    health_router,
+    prefix="/health",
+    tags=["health"],
 )
+
+if FAST_BOOT:
+    from graphql_api.lazy import LazyGraphQLApp
+
+    api_router.add_route(
+        "/graphql",
+        LazyGraphQLApp(),
+        methods=["GET", "POST"],
+        include_in_schema=False,
+    )
+else:
+    from graphql_api.api import graphql_router
+
+    api_router.include_router(
+        graphql_router,
+        prefix="/graphql",
+        tags=["graphql"],
+    )
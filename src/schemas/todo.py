@@ -2,10 +2,12 @@
 This file contains the schemas for the Todo.
 """
 
-from typing import List, Optional
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+from typing_extensions import TypedDict
 
 
 class Todo(BaseModel):
@@ -35,6 +37,21 @@ class TodoUpdate(Todo):
     title: Optional[str]
     description: Optional[str]
     is_completed: Optional[bool] = False
+    version: Optional[int] = None
+
+
+class TodoPatch(BaseModel):
+    """
+    Todo Patch Schema
+
+    Only the fields that are sent are changed. Title and is_completed can't
+    be null.
+    """
+
+    title: str = None
+    description: Optional[str] = None
+    is_completed: bool = None
+    version: Optional[int] = None
 
 
 class TodoResponse(Todo):
@@ -44,6 +61,7 @@ class TodoResponse(Todo):
 
     model_config = ConfigDict(from_attributes=True)
     id: UUID
+    version: int
 
 
 class TodoAll(BaseModel):
@@ -53,3 +71,79 @@ class TodoAll(BaseModel):
 
     total: int
     data: List[TodoResponse]
+    next_cursor: Optional[str] = None
+
+
+@lru_cache(maxsize=64)
+def get_page_adapter(columns: Tuple[str, ...]) -> TypeAdapter:
+    """
+    Get the validator of a TodoAll page whose rows hold only ``columns``.
+
+    Rows are TypedDicts rather than models, so a page of plain dictionaries
+    is validated by pydantic-core without building an object per row.
+
+    Args:
+        columns: The TodoResponse fields of the rows.
+    """
+    row = TypedDict(
+        "TodoRow",
+        {name: TodoResponse.model_fields[name].annotation for name in columns},
+    )
+    page = TypedDict(
+        "TodoPage",
+        {"total": int, "data": List[row], "next_cursor": Optional[str]},
+    )
+    return TypeAdapter(page)
+
+
+class TodoBulkUpdate(Todo):
+    """
+    Todo Bulk Update Schema
+
+    Only the fields that are sent are changed. Title and is_completed can't
+    be null.
+    """
+
+    id: UUID
+    title: str = None
+    description: Optional[str] = None
+    is_completed: bool = None
+
+
+class BulkError(BaseModel):
+    """
+    Bulk Error Schema
+    """
+
+    index: int
+    id: Optional[UUID] = None
+    detail: Any
+
+
+class TodoBulk(BaseModel):
+    """
+    Todo Bulk Schema
+    """
+
+    data: List[TodoResponse]
+    errors: List[BulkError]
+
+
+class ImportLineError(BaseModel):
+    """
+    Import Line Error Schema
+    """
+
+    line: int
+    detail: Any
+
+
+class TodoImport(BaseModel):
+    """
+    Todo Import Schema
+    """
+
+    inserted: int
+    rejected: int
+    errors: List[ImportLineError]
+    elapsed: float
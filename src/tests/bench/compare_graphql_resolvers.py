@@ -0,0 +1,135 @@
+"""
+This file compares multi-field GraphQL queries on sync and async resolvers.
+
+The async resolvers are the real schema. The sync resolvers are the same
+root fields written as plain methods on a ``Session`` from the sync engine,
+which strawberry runs one after the other on the event loop.
+
+Run it with the CRUD cache disabled, so both sides hit the database:
+
+    CRUD_CACHE_SIZE=0 PYTHONPATH=src \
+        python -m tests.bench.compare_graphql_resolvers
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import Optional
+from uuid import UUID
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+)
+
+import httpx  # noqa: E402
+import strawberry  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from sqlmodel import Session  # noqa: E402
+from strawberry.fastapi import GraphQLRouter  # noqa: E402
+
+from config.database import engine, init_db  # noqa: E402
+from crud.todo import todo as todo_crud  # noqa: E402
+from graphql_api.schemas import TodoAllType, TodoType  # noqa: E402
+from main import app as async_app  # noqa: E402
+from schemas.todo import TodoCreate  # noqa: E402
+
+
+@strawberry.type
+class SyncQuery:
+    @strawberry.field
+    def get_all_todos(self, limit: int = 100) -> TodoAllType:
+        with Session(engine) as db:
+            return TodoAllType(**todo_crud.all(db, limit=limit))
+
+    @strawberry.field
+    def get_todo(self, todo_id: UUID) -> Optional[TodoType]:
+        with Session(engine) as db:
+            return todo_crud.get(db, todo_id)
+
+
+def build_sync_app() -> FastAPI:
+    """
+    Build an app serving the GraphQL API through sync resolvers.
+    """
+    sync_app = FastAPI()
+    sync_app.include_router(
+        GraphQLRouter(strawberry.Schema(query=SyncQuery)),
+        prefix="/api/graphql",
+    )
+    return sync_app
+
+
+def build_query(ids) -> str:
+    """
+    Build a query with one page and one aliased getTodo field per id.
+    """
+    fields = "\n".join(
+        f'todo{i}: getTodo(todoId: "{id}") {{ id title }}'
+        for i, id in enumerate(ids)
+    )
+    return f"""
+    query {{
+      page: getAllTodos(limit: 20) {{ total data {{ id title }} }}
+      {fields}
+    }}
+    """
+
+
+async def run(app, query: str, total: int, concurrency: int) -> float:
+    """
+    Send ``total`` queries to ``app`` with ``concurrency`` workers.
+
+    Returns:
+        The throughput in operations per second.
+    """
+    transport = httpx.ASGITransport(app=app)
+    counter = iter(range(total))
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+
+        async def worker():
+            for _ in counter:
+                response = await client.post(
+                    "/api/graphql", json={"query": query}
+                )
+                assert "errors" not in response.json(), response.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--fields", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    init_db()
+    with Session(engine) as db:
+        ids = [
+            todo_crud.create(
+                db, TodoCreate(title=f"Todo {i}", description="bench")
+            ).id
+            for i in range(args.rows)
+        ]
+    query = build_query(ids[: args.fields])
+
+    print(f"{'resolvers':<12}{'ops/s':>12}")
+    for name, app in (("sync", build_sync_app()), ("async", async_app)):
+        throughput = asyncio.run(
+            run(app, query, args.requests, args.concurrency)
+        )
+        print(f"{name:<12}{throughput:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
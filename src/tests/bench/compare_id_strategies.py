@@ -0,0 +1,128 @@
+"""
+This file compares uuid4 and uuid7 primary keys on insert speed and size.
+
+Each strategy fills its own table shaped like ``todo`` in batches, and the
+script reports the insert throughput and the size of the table and of its
+primary key index. On SQLite the sizes come from ``dbstat``; on Postgres
+from ``pg_relation_size``.
+
+Run it with:
+
+    PYTHONPATH=src python -m tests.bench.compare_id_strategies --rows 1000000
+
+Set DATABASE_URL to run it against Postgres instead of a temporary SQLite
+file.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Uuid,
+    create_engine,
+    insert,
+    text,
+)
+
+from models.base import utcnow
+from models.ids import ID_STRATEGIES
+
+
+def build_table(metadata: MetaData, strategy: str) -> Table:
+    """
+    Build a table with the columns of ``todo`` for one id strategy.
+    """
+    return Table(
+        f"bench_{strategy}",
+        metadata,
+        Column("id", Uuid, primary_key=True),
+        Column("is_active", Boolean, nullable=False),
+        Column("date_created", DateTime, nullable=False),
+        Column("title", String, nullable=False),
+        Column("description", String),
+        Column("is_completed", Boolean, nullable=False),
+        Column("version", Integer, nullable=False),
+    )
+
+
+def get_sizes(connection, table: Table) -> tuple:
+    """
+    Get the size in bytes of a table and of its primary key index.
+    """
+    if connection.dialect.name == "postgresql":
+        table_size = connection.execute(
+            text("SELECT pg_relation_size(:name)"), {"name": table.name}
+        ).scalar()
+        index_size = connection.execute(
+            text("SELECT pg_relation_size(:name)"),
+            {"name": f"{table.name}_pkey"},
+        ).scalar()
+        return table_size, index_size
+
+    def size(name):
+        return connection.execute(
+            text("SELECT SUM(pgsize) FROM dbstat WHERE name = :name"),
+            {"name": name},
+        ).scalar()
+
+    # SQLite keeps a uuid primary key in an automatic index.
+    return size(table.name), size(f"sqlite_autoindex_{table.name}_1")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=10_000)
+    args = parser.parse_args()
+
+    url = os.getenv("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+    engine = create_engine(url)
+    metadata = MetaData()
+    tables = {
+        strategy: build_table(metadata, strategy) for strategy in ID_STRATEGIES
+    }
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+
+    print(f"{'strategy':<10}{'rows/s':>12}{'table MiB':>12}{'index MiB':>12}")
+    for strategy, factory in ID_STRATEGIES.items():
+        table = tables[strategy]
+        start = time.perf_counter()
+        for offset in range(0, args.rows, args.batch):
+            rows = [
+                {
+                    "id": factory(),
+                    "is_active": True,
+                    "date_created": utcnow(),
+                    "title": f"Todo {offset + i}",
+                    "description": "bench",
+                    "is_completed": False,
+                    "version": 1,
+                }
+                for i in range(min(args.batch, args.rows - offset))
+            ]
+            with engine.begin() as connection:
+                connection.execute(insert(table), rows)
+        elapsed = time.perf_counter() - start
+
+        with engine.connect() as connection:
+            table_size, index_size = get_sizes(connection, table)
+        print(
+            f"{strategy:<10}{args.rows / elapsed:>12.0f}"
+            f"{table_size / 2**20:>12.1f}{index_size / 2**20:>12.1f}"
+        )
+
+    metadata.drop_all(engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+This file compares the throughput of the sync and async REST paths.
+
+The async path is the real application. The sync path is the same set of
+routes written as plain ``def`` handlers on a ``Session`` from the sync
+engine, which is what the API looked like before the async engine existed.
+
+Run it with:
+
+    PYTHONPATH=src python -m tests.bench.compare_sync_async --requests 2000
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from uuid import UUID
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+)
+
+import httpx  # noqa: E402
+from fastapi import FastAPI, HTTPException  # noqa: E402
+from sqlmodel import Session  # noqa: E402
+
+from config.database import engine, init_db  # noqa: E402
+from crud.todo import todo as todo_crud  # noqa: E402
+from main import app as async_app  # noqa: E402
+from schemas.todo import TodoCreate  # noqa: E402
+
+
+def build_sync_app() -> FastAPI:
+    """
+    Build an app serving the task routes through the sync threadpool path.
+    """
+    sync_app = FastAPI()
+
+    @sync_app.get("/api/tasks/")
+    def get_all_todos():
+        with Session(engine) as db:
+            return todo_crud.all(db)
+
+    @sync_app.get("/api/tasks/{todo_id}")
+    def get_todo(todo_id: UUID):
+        with Session(engine) as db:
+            todo = todo_crud.get(db, todo_id)
+            if not todo:
+                raise HTTPException(status_code=404)
+            return todo
+
+    return sync_app
+
+
+async def run(app, paths, total: int, concurrency: int) -> float:
+    """
+    Fire ``total`` requests at ``app`` with ``concurrency`` workers.
+
+    Returns:
+        The throughput in requests per second.
+    """
+    transport = httpx.ASGITransport(app=app)
+    counter = iter(range(total))
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+
+        async def worker():
+            for i in counter:
+                response = await client.get(paths[i % len(paths)])
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    init_db()
+    with Session(engine) as db:
+        ids = [
+            todo_crud.create(
+                db, TodoCreate(title=f"Todo {i}", description="bench")
+            ).id
+            for i in range(args.rows)
+        ]
+
+    paths = ["/api/tasks/"] + [f"/api/tasks/{id}" for id in ids]
+    print(f"{'path':<8}{'req/s':>12}")
+    for name, app in (("sync", build_sync_app()), ("async", async_app)):
+        throughput = asyncio.run(
+            run(app, paths, args.requests, args.concurrency)
+        )
+        print(f"{name:<8}{throughput:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+This file contains the fixtures of the benchmark suite.
+
+The benchmarks run with ``pytest --bench`` against the test database, which
+is seeded with every size of ``--bench-rows`` in turn. The fastest time of
+each benchmark, the one least disturbed by the rest of the machine, is
+compared with the one stored in the local baseline, and the benchmark fails
+when it is more than ``--bench-tolerance`` plus ``--bench-floor``
+milliseconds slower.
+"""
+
+import json
+import os
+import statistics
+import time
+from typing import Any, Callable, Dict, Optional
+
+import pytest
+from sqlalchemy import delete, func, insert, select
+from sqlmodel import Session
+
+from config.database import engine
+from crud.todo import todo as todo_crud
+from models.base import utcnow
+from models.ids import new_id
+from models.todo import Todo
+from schemas.todo import TodoCreate
+
+SEED_DESCRIPTION = "bench seed"
+SEED_BATCH_SIZE = 10_000
+SUFFIXES = {"k": 1_000, "M": 1_000_000}
+
+
+def parse_rows(value: str) -> int:
+    """
+    Parse a table size such as ``1000``, ``100k`` or ``1M``.
+    """
+    value = value.strip()
+    if value[-1:] in SUFFIXES:
+        return int(value[:-1]) * SUFFIXES[value[-1]]
+    return int(value)
+
+
+def pytest_generate_tests(metafunc):
+    if "bench_rows" in metafunc.fixturenames:
+        labels = metafunc.config.getoption("--bench-rows").split(",")
+        labels = sorted(
+            (label.strip() for label in labels if label.strip()),
+            key=parse_rows,
+        )
+        metafunc.parametrize(
+            "bench_rows",
+            [parse_rows(label) for label in labels],
+            ids=labels,
+            indirect=True,
+            scope="session",
+        )
+
+
+def seed(rows: int):
+    """
+    Insert seed todos until the table holds at least ``rows`` of them.
+    """
+    with Session(engine) as db:
+        seeded = db.scalar(
+            select(func.count())
+            .select_from(Todo)
+            .where(Todo.description == SEED_DESCRIPTION)
+        )
+        for offset in range(seeded, rows, SEED_BATCH_SIZE):
+            now = utcnow()
+            db.execute(
+                insert(Todo),
+                [
+                    {
+                        "id": new_id(),
+                        "is_active": True,
+                        "date_created": now,
+                        "date_updated": now,
+                        "title": f"Bench todo {i}",
+                        "description": SEED_DESCRIPTION,
+                        "is_completed": i % 2 == 0,
+                        "version": 1,
+                    }
+                    for i in range(offset, min(offset + SEED_BATCH_SIZE, rows))
+                ],
+            )
+            db.commit()
+
+
+@pytest.fixture(scope="session")
+def bench_rows(request):
+    """
+    Seed the todo table with ``--bench-rows`` todos.
+
+    The sizes run in increasing order, so each one only adds the rows it is
+    missing. The seed todos are deleted at the end of the session.
+
+    Yields:
+        The number of rows seeded.
+    """
+    seed(request.param)
+    yield request.param
+
+
+@pytest.fixture(scope="session", autouse=True)
+def bench_cleanup():
+    """
+    Delete the seed todos once every benchmark has run.
+    """
+    yield
+    with Session(engine) as db:
+        db.execute(delete(Todo).where(Todo.description == SEED_DESCRIPTION))
+        db.commit()
+
+
+@pytest.fixture(autouse=True)
+def no_cache(monkeypatch):
+    """
+    Disable the CRUD cache, so reads are timed against the database.
+    """
+    monkeypatch.setattr(todo_crud, "cache", None)
+
+
+@pytest.fixture(scope="session")
+def bench_results(request):
+    """
+    Collect the timings of the session and write them to the baseline when
+    ``--bench-update-baseline`` is set.
+
+    Yields:
+        The timings by benchmark name.
+    """
+    config = request.config
+    path = config.getoption("--bench-baseline")
+    results: Dict[str, Dict[str, float]] = {}
+    yield results
+
+    if config.getoption("--bench-update-baseline") and results:
+        baseline = load_baseline(path)
+        baseline.update(results)
+        with open(path, "w") as file:
+            json.dump(dict(sorted(baseline.items())), file, indent=2)
+            file.write("\n")
+
+
+def load_baseline(path: str) -> Dict[str, Dict[str, float]]:
+    """
+    Read the baseline file, or an empty baseline if there is none.
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return json.load(file)
+
+
+class Benchmark:
+    """
+    Time a function and check it against its baseline.
+
+    Attributes:
+        name: The name of the benchmark in the baseline.
+        rounds: The number of timed calls.
+        tolerance: The fraction the minimum may exceed the baseline by.
+        floor: The seconds the minimum may exceed the baseline by on top of
+            the tolerance, which covers the jitter of the fastest calls.
+        expected: The baseline timings of the benchmark, if any.
+        results: The timings of the session, filled by each call.
+    """
+
+    warmup = 2
+
+    def __init__(
+        self,
+        name: str,
+        rounds: int,
+        tolerance: float,
+        floor: float,
+        expected: Optional[Dict[str, float]],
+        results: Dict[str, Dict[str, float]],
+    ):
+        self.name = name
+        self.rounds = rounds
+        self.tolerance = tolerance
+        self.floor = floor
+        self.expected = expected
+        self.results = results
+
+    def __call__(
+        self,
+        function: Callable[..., Any],
+        setup: Optional[Callable[[], tuple]] = None,
+    ) -> Dict[str, float]:
+        """
+        Time ``function`` over the warmup and timed rounds.
+
+        Args:
+            function: The function to time.
+            setup: Called untimed before every call, returning the arguments
+                of ``function``, e.g. a fresh todo to delete.
+
+        Returns:
+            The median and minimum seconds per call.
+
+        Raises:
+            AssertionError: If the minimum regressed beyond the tolerance
+                and the floor.
+        """
+        timings = []
+        for _ in range(self.warmup + self.rounds):
+            args = setup() if setup is not None else ()
+            start = time.perf_counter()
+            function(*args)
+            timings.append(time.perf_counter() - start)
+        timings = timings[self.warmup :]
+
+        result = {
+            "median": statistics.median(timings),
+            "min": min(timings),
+        }
+        self.results[self.name] = result
+
+        if self.expected is not None:
+            # The median moves with the load of the machine, the minimum
+            # only with the code.
+            expected = self.expected["min"]
+            limit = expected * (1 + self.tolerance) + self.floor
+            assert result["min"] <= limit, (
+                f"{self.name} regressed: min {result['min'] * 1e3:.3f} ms, "
+                f"baseline {expected * 1e3:.3f} ms (+{self.tolerance:.0%} "
+                f"+ {self.floor * 1e3:.3f} ms allowed)"
+            )
+        return result
+
+
+@pytest.fixture
+def benchmark(request, bench_results) -> Benchmark:
+    """
+    Get a benchmark named after the test and its table size.
+    """
+    config = request.config
+    update = config.getoption("--bench-update-baseline")
+    baseline = load_baseline(config.getoption("--bench-baseline"))
+    return Benchmark(
+        request.node.name,
+        config.getoption("--bench-rounds"),
+        config.getoption("--bench-tolerance"),
+        config.getoption("--bench-floor") / 1e3,
+        None if update else baseline.get(request.node.name),
+        bench_results,
+    )
+
+
+@pytest.fixture
+def make_todo(db) -> Callable[[], Todo]:
+    """
+    Get a function creating a todo that is deleted with the seed todos.
+    """
+
+    def make() -> Todo:
+        return todo_crud.create(
+            db, TodoCreate(title="Bench todo", description=SEED_DESCRIPTION)
+        )
+
+    return make
@@ -0,0 +1,433 @@
+"""
+This file drives a load test against the application served by uvicorn.
+
+The script migrates and seeds a database, starts ``main:app`` under uvicorn
+in a subprocess, and replays a weighted mix of REST and GraphQL operations
+with an async HTTP client, either with a fixed number of concurrent clients
+or at a fixed arrival rate. It reports the throughput, the latency
+percentiles and the error rate of every operation.
+
+Run it with:
+
+    PYTHONPATH=src python -m tests.bench.load --concurrency 32 --duration 30
+    PYTHONPATH=src python -m tests.bench.load --rate 200 --duration 30
+
+The server gets the environment of the script, plus every ``--env`` given,
+so deployment configurations can be compared run by run, e.g.
+``--env DB_POOL_SIZE=20 --workers 4``. It uses DATABASE_URL when set, and a
+temporary SQLite file otherwise. Pass ``--url`` to load a server that is
+already running instead.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+from uuid import uuid4
+
+import httpx
+
+OPERATIONS = (
+    "list",
+    "get",
+    "create",
+    "update",
+    "delete",
+    "graphql_list",
+    "graphql_get",
+)
+DEFAULT_MIX = (
+    "list=30,get=30,create=10,update=15,delete=5,"
+    "graphql_list=5,graphql_get=5"
+)
+SEED_BATCH_SIZE = 1_000
+SRC_PATH = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+GRAPHQL_LIST = "{ getAllTodos(limit: 20) { total data { id title } } }"
+GRAPHQL_GET = "query ($id: UUID!) { getTodo(todoId: $id) { id title } }"
+
+
+class Workload:
+    """
+    The operations of the load test and the todos they work on.
+
+    Attributes:
+        ids: The ids of the todos created and not deleted yet.
+    """
+
+    def __init__(self, ids: List[str]):
+        self.ids = ids
+        self.created = 0
+
+    def pick(self) -> str:
+        """
+        Pick a random live todo, or a random id when none is left.
+        """
+        return random.choice(self.ids) if self.ids else str(uuid4())
+
+    async def list(self, client: httpx.AsyncClient) -> httpx.Response:
+        return await client.get("/api/tasks/", params={"limit": 20})
+
+    async def get(self, client: httpx.AsyncClient) -> httpx.Response:
+        return await client.get(f"/api/tasks/{self.pick()}")
+
+    async def create(self, client: httpx.AsyncClient) -> httpx.Response:
+        self.created += 1
+        response = await client.post(
+            "/api/tasks/",
+            json={"title": f"Load todo {self.created}", "description": "load"},
+        )
+        if response.status_code == 200:
+            self.ids.append(response.json()["id"])
+        return response
+
+    async def update(self, client: httpx.AsyncClient) -> httpx.Response:
+        return await client.patch(
+            f"/api/tasks/{self.pick()}",
+            json={"is_completed": random.random() < 0.5},
+        )
+
+    async def delete(self, client: httpx.AsyncClient) -> httpx.Response:
+        if not self.ids:
+            return await client.delete(f"/api/tasks/{uuid4()}")
+        id = self.ids.pop(random.randrange(len(self.ids)))
+        return await client.delete(f"/api/tasks/{id}")
+
+    async def graphql_list(self, client: httpx.AsyncClient) -> httpx.Response:
+        return await client.post("/api/graphql", json={"query": GRAPHQL_LIST})
+
+    async def graphql_get(self, client: httpx.AsyncClient) -> httpx.Response:
+        return await client.post(
+            "/api/graphql",
+            json={"query": GRAPHQL_GET, "variables": {"id": self.pick()}},
+        )
+
+
+class Recorder:
+    """
+    The latencies and errors of the operations of a load test.
+
+    Attributes:
+        calls: The number of calls by operation.
+        latencies: The seconds each answered call took, by operation.
+        errors: The number of failed calls by operation and reason.
+    """
+
+    def __init__(self):
+        self.calls: Counter = Counter()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Counter] = defaultdict(Counter)
+
+    async def call(
+        self,
+        name: str,
+        workload: Workload,
+        client: httpx.AsyncClient,
+        start: Optional[float] = None,
+    ):
+        """
+        Run one operation and record its outcome.
+
+        Args:
+            name: The name of the operation.
+            workload: The workload running it.
+            client: The client to send it with.
+            start: When the call was due, so the time it waited for a free
+                connection counts. Defaults to now.
+        """
+        start = time.perf_counter() if start is None else start
+        self.calls[name] += 1
+        try:
+            response = await getattr(workload, name)(client)
+        except httpx.HTTPError as error:
+            self.errors[name][type(error).__name__] += 1
+            return
+        elapsed = time.perf_counter() - start
+        # GraphQL reports resolver errors in the body of a 200.
+        if response.status_code >= 400 or (
+            name.startswith("graphql") and "errors" in response.json()
+        ):
+            self.errors[name][str(response.status_code)] += 1
+        self.latencies[name].append(elapsed)
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """
+    Parse an operation mix such as ``list=3,get=1`` into weights.
+
+    Raises:
+        argparse.ArgumentTypeError: On an unknown operation or bad weight.
+    """
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"Unknown operation: {name}")
+        try:
+            mix[name] = float(weight or 1)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Bad weight: {part}")
+    return mix
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Get the nearest-rank percentile of sorted values.
+    """
+    if not values:
+        return 0.0
+    index = max(0, int(round(fraction * len(values) + 0.5)) - 1)
+    return values[min(index, len(values) - 1)]
+
+
+def free_port() -> int:
+    """
+    Get a TCP port nothing listens on.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def serve(env: Dict[str, str], workers: int) -> Iterator[str]:
+    """
+    Run the application under uvicorn until the block exits.
+
+    Yields:
+        The base url of the server.
+    """
+    port = free_port()
+    subprocess.run(
+        [sys.executable, "-m", "migrations.runner"],
+        env=env,
+        capture_output=True,
+        check=True,
+    )
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "main:app",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError("uvicorn exited before serving requests")
+            try:
+                httpx.get(f"{url}/api/health/db").raise_for_status()
+                break
+            except httpx.HTTPError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.1)
+        yield url
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+async def seed(client: httpx.AsyncClient, rows: int) -> List[str]:
+    """
+    Create ``rows`` todos through the bulk endpoint.
+
+    Returns:
+        The ids of the todos created.
+    """
+    ids = []
+    for offset in range(0, rows, SEED_BATCH_SIZE):
+        items = [
+            {"title": f"Seed todo {i}", "description": "load"}
+            for i in range(offset, min(offset + SEED_BATCH_SIZE, rows))
+        ]
+        response = await client.post("/api/tasks/bulk", json=items)
+        response.raise_for_status()
+        ids.extend(todo["id"] for todo in response.json()["data"])
+    return ids
+
+
+async def run_load(url: str, args) -> Dict:
+    """
+    Seed the server and replay the operation mix against it.
+
+    Returns:
+        The report of the run.
+    """
+    names = list(args.mix)
+    weights = [args.mix[name] for name in names]
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.connections)
+
+    async with httpx.AsyncClient(
+        base_url=url, limits=limits, timeout=args.timeout
+    ) as client:
+        workload = Workload(await seed(client, args.seed))
+        end = time.perf_counter() + args.duration
+        start = time.perf_counter()
+
+        if args.rate:
+            # Open loop: calls are due at a fixed rate whatever the latency,
+            # and a call that waits for a connection is timed from when it
+            # was due.
+            tasks = set()
+            due = start
+            while due < end:
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+                name = random.choices(names, weights)[0]
+                task = asyncio.create_task(
+                    recorder.call(name, workload, client, due)
+                )
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                due += 1 / args.rate
+            await asyncio.gather(*tasks)
+        else:
+
+            async def worker():
+                while time.perf_counter() < end:
+                    name = random.choices(names, weights)[0]
+                    await recorder.call(name, workload, client)
+
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return build_report(recorder, elapsed, args)
+
+
+def build_report(recorder: Recorder, elapsed: float, args) -> Dict:
+    """
+    Summarize the latencies and errors of a run.
+    """
+    operations = {}
+    for name in args.mix:
+        latencies = sorted(recorder.latencies[name])
+        errors = recorder.errors[name]
+        operations[name] = {
+            "calls": recorder.calls[name],
+            "errors": sum(errors.values()),
+            "error_reasons": dict(errors),
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p95_ms": percentile(latencies, 0.95) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+            "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+        }
+
+    latencies = sorted(
+        latency for name in args.mix for latency in recorder.latencies[name]
+    )
+    calls = sum(operation["calls"] for operation in operations.values())
+    errors = sum(operation["errors"] for operation in operations.values())
+    return {
+        "mode": (
+            f"rate={args.rate}/s"
+            if args.rate
+            else f"concurrency={args.concurrency}"
+        ),
+        "workers": args.workers,
+        "env": args.env,
+        "duration_s": elapsed,
+        "calls": calls,
+        "throughput_rps": calls / elapsed,
+        "error_rate": errors / calls if calls else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "operations": operations,
+    }
+
+
+def print_report(report: Dict):
+    """
+    Print a report as a table.
+    """
+    print(
+        f"{report['mode']}, {report['workers']} worker(s), "
+        f"{report['duration_s']:.1f} s: {report['calls']} calls, "
+        f"{report['throughput_rps']:.1f} req/s, "
+        f"{report['error_rate']:.2%} errors"
+    )
+    print(
+        f"\n{'operation':<14}{'calls':>8}{'errors':>8}{'p50 ms':>10}"
+        f"{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    )
+    for name, operation in report["operations"].items():
+        print(
+            f"{name:<14}{operation['calls']:>8}{operation['errors']:>8}"
+            f"{operation['p50_ms']:>10.1f}{operation['p95_ms']:>10.1f}"
+            f"{operation['p99_ms']:>10.1f}{operation['max_ms']:>10.1f}"
+        )
+    print(
+        f"{'all':<14}{report['calls']:>8}{'':>8}{report['p50_ms']:>10.1f}"
+        f"{report['p95_ms']:>10.1f}{report['p99_ms']:>10.1f}"
+    )
+    for name, operation in report["operations"].items():
+        if operation["error_reasons"]:
+            print(f"{name} errors: {operation['error_reasons']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=float, default=10.0)
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", type=int, default=16)
+    load.add_argument("--rate", type=float, help="calls per second")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX)
+    parser.add_argument("--seed", type=int, default=1_000)
+    parser.add_argument("--connections", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--env",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="set an environment variable of the server",
+    )
+    parser.add_argument("--url", help="load a server already running")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    if args.url:
+        report = asyncio.run(run_load(args.url, args))
+    else:
+        env = dict(os.environ)
+        env.setdefault(
+            "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/load.db"
+        )
+        env["PYTHONPATH"] = os.pathsep.join(
+            filter(None, (SRC_PATH, env.get("PYTHONPATH")))
+        )
+        env.update(item.split("=", 1) for item in args.env)
+        with serve(env, args.workers) as url:
+            report = asyncio.run(run_load(url, args))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+This file reports the cold-start cost of the Lambda handler.
+
+For the default and the fast-boot configurations, the script imports
+``main`` in a fresh interpreter with ``-X importtime``, then sends the first
+REST and GraphQL requests through the Mangum handler, the way Lambda does.
+It reports the slowest imports and the time from interpreter start to each
+first response.
+
+Run it with:
+
+    PYTHONPATH=src python -m tests.bench.startup_report
+
+Pass ``--json`` to print a machine-readable report, e.g. to track it in CI.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+
+IMPORT_TIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+# Runs in the child interpreter, timed from its first line.
+CHILD = """
+import json, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+def invoke(method, path, body=""):
+    event = {
+        "version": "2.0",
+        "routeKey": "$default",
+        "rawPath": path,
+        "rawQueryString": "",
+        "headers": {"host": "localhost", "content-type": "application/json"},
+        "requestContext": {
+            "http": {
+                "method": method,
+                "path": path,
+                "protocol": "HTTP/1.1",
+                "sourceIp": "127.0.0.1",
+                "userAgent": "startup-report",
+            },
+            "stage": "$default",
+        },
+        "body": body,
+        "isBase64Encoded": False,
+    }
+    response = main.handler(event, None)
+    assert response["statusCode"] == 200, response
+    return time.perf_counter()
+
+rest = invoke("GET", "/api/tasks/")
+graphql = invoke(
+    "POST", "/api/graphql", json.dumps({"query": "{ getAllTodos { total } }"})
+)
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_rest_ms": (rest - start) * 1000,
+    "first_graphql_ms": (graphql - start) * 1000,
+}))
+"""
+
+
+def parse_import_times(stderr: str) -> List[Dict]:
+    """
+    Parse the ``-X importtime`` output of an interpreter.
+
+    Returns:
+        The modules with their self and cumulative import times in ms.
+    """
+    modules = []
+    for line in stderr.splitlines():
+        match = IMPORT_TIME.match(line)
+        if match:
+            modules.append(
+                {
+                    "module": match.group(4),
+                    "self_ms": int(match.group(1)) / 1000,
+                    "cumulative_ms": int(match.group(2)) / 1000,
+                    "depth": len(match.group(3)) // 2,
+                }
+            )
+    return modules
+
+
+def measure(env: Dict[str, str]) -> Dict:
+    """
+    Measure one cold start of the handler in a fresh interpreter.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    modules = parse_import_times(result.stderr)
+    report["total_import_ms"] = sum(module["self_ms"] for module in modules)
+    report["modules"] = modules
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/boot.db")
+    # Both configurations start from an up-to-date schema.
+    subprocess.run(
+        [sys.executable, "-m", "migrations.runner"],
+        env=env,
+        capture_output=True,
+        check=True,
+    )
+
+    reports = {}
+    for mode, fast_boot in (("default", "0"), ("fast_boot", "1")):
+        runs = [
+            measure({**env, "FAST_BOOT": fast_boot}) for _ in range(args.runs)
+        ]
+        # Keep the fastest run, the one least disturbed by the machine.
+        best = min(runs, key=lambda run: run["first_rest_ms"])
+        best["modules"] = sorted(
+            best["modules"], key=lambda module: module["cumulative_ms"]
+        )[::-1][: args.top]
+        reports[mode] = best
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return
+
+    print(f"{'mode':<12}{'import ms':>12}{'1st REST ms':>14}{'1st GQL ms':>14}")
+    for mode, report in reports.items():
+        print(
+            f"{mode:<12}{report['import_ms']:>12.1f}"
+            f"{report['first_rest_ms']:>14.1f}"
+            f"{report['first_graphql_ms']:>14.1f}"
+        )
+    for mode, report in reports.items():
+        print(f"\nSlowest imports ({mode}):")
+        for module in report["modules"]:
+            print(f"{module['cumulative_ms']:>10.1f} ms  {module['module']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+This file contains the benchmarks of the Todo CRUD operations.
+"""
+
+import pytest
+
+from crud.todo import todo as todo_crud
+from schemas.todo import TodoPatch
+
+pytestmark = pytest.mark.bench
+
+
+def test_crud_get(bench_rows, benchmark, db, make_todo):
+    todo = make_todo()
+
+    benchmark(lambda: todo_crud.get(db, todo.id))
+
+
+def test_crud_all(bench_rows, benchmark, db):
+    benchmark(lambda: todo_crud.all(db, limit=100))
+
+
+def test_crud_all_filtered(bench_rows, benchmark, db):
+    benchmark(
+        lambda: todo_crud.all(
+            db,
+            limit=100,
+            filters={"is_completed": False},
+            order_by="title",
+            columns=["id", "title", "is_completed"],
+        )
+    )
+
+
+def test_crud_create(bench_rows, benchmark, make_todo):
+    benchmark(make_todo)
+
+
+def test_crud_update(bench_rows, benchmark, db, make_todo):
+    todo = make_todo()
+
+    benchmark(
+        lambda: todo_crud.update(db, todo.id, TodoPatch(is_completed=True))
+    )
+
+
+def test_crud_delete(bench_rows, benchmark, db, make_todo):
+    benchmark(
+        lambda todo: todo_crud.delete(db, todo.id),
+        setup=lambda: (make_todo(),),
+    )
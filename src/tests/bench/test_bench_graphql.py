@@ -0,0 +1,75 @@
+"""
+This file contains the benchmarks of the Todo GraphQL operations.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+
+pytestmark = pytest.mark.bench
+
+client = TestClient(app)
+
+
+def execute(query: str, **variables):
+    """
+    Run a GraphQL operation that must succeed.
+    """
+    response = client.post(
+        "/api/graphql", json={"query": query, "variables": variables}
+    )
+    data = response.json()
+    assert "errors" not in data, data
+    return data
+
+
+def test_graphql_get(bench_rows, benchmark, make_todo):
+    todo = make_todo()
+
+    benchmark(
+        lambda: execute(
+            "query ($id: UUID!) { getTodo(todoId: $id) { id title } }",
+            id=str(todo.id),
+        )
+    )
+
+
+def test_graphql_list(bench_rows, benchmark):
+    benchmark(
+        lambda: execute(
+            "{ getAllTodos(limit: 100) { total data { id title isCompleted } } }"
+        )
+    )
+
+
+def test_graphql_create(bench_rows, benchmark):
+    benchmark(
+        lambda: execute(
+            'mutation { createTodo(todo: { title: "Bench todo", '
+            'description: "bench seed" }) { id } }'
+        )
+    )
+
+
+def test_graphql_update(bench_rows, benchmark, make_todo):
+    todo = make_todo()
+
+    benchmark(
+        lambda: execute(
+            "mutation ($id: UUID!) { updateTodo(todoId: $id, "
+            'todo: { title: "Bench todo", description: "bench seed", '
+            "isCompleted: true }) { id version } }",
+            id=str(todo.id),
+        )
+    )
+
+
+def test_graphql_delete(bench_rows, benchmark, make_todo):
+    benchmark(
+        lambda todo: execute(
+            "mutation ($id: UUID!) { deleteTodo(todoId: $id) { id } }",
+            id=str(todo.id),
+        ),
+        setup=lambda: (make_todo(),),
+    )
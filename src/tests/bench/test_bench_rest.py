@@ -0,0 +1,72 @@
+"""
+This file contains the benchmarks of the Todo REST routes.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+
+pytestmark = pytest.mark.bench
+
+client = TestClient(app)
+
+
+def request(method: str, url: str, **kwargs):
+    """
+    Make a request that must succeed.
+    """
+    response = client.request(method, url, **kwargs)
+    assert response.status_code == 200, response.text
+    return response
+
+
+def test_rest_get(bench_rows, benchmark, make_todo):
+    todo = make_todo()
+
+    benchmark(lambda: request("GET", f"/api/tasks/{todo.id}"))
+
+
+def test_rest_list(bench_rows, benchmark):
+    benchmark(lambda: request("GET", "/api/tasks"))
+
+
+def test_rest_list_filtered(bench_rows, benchmark):
+    benchmark(
+        lambda: request(
+            "GET",
+            "/api/tasks",
+            params={
+                "is_completed": "false",
+                "sort": "title",
+                "fields": "id,title,is_completed",
+            },
+        )
+    )
+
+
+def test_rest_create(bench_rows, benchmark):
+    benchmark(
+        lambda: request(
+            "POST",
+            "/api/tasks",
+            json={"title": "Bench todo", "description": "bench seed"},
+        )
+    )
+
+
+def test_rest_update(bench_rows, benchmark, make_todo):
+    todo = make_todo()
+
+    benchmark(
+        lambda: request(
+            "PATCH", f"/api/tasks/{todo.id}", json={"is_completed": True}
+        )
+    )
+
+
+def test_rest_delete(bench_rows, benchmark, make_todo):
+    benchmark(
+        lambda todo: request("DELETE", f"/api/tasks/{todo.id}"),
+        setup=lambda: (make_todo(),),
+    )
@@ -0,0 +1,144 @@
+"""
+This file contains the shared pytest configuration for the tests.
+"""
+
+import os
+import tempfile
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from config.database import get_db, init_db  # noqa: E402
+from main import app  # noqa: E402, F401
+from monitoring.queries import count_queries  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    """
+    Create the database schema once for the whole test session.
+    """
+    init_db()
+
+
+@pytest.fixture
+def db():
+    """
+    Get a database session that is closed after the test.
+    """
+    yield from get_db()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("bench", "benchmarks")
+    group.addoption(
+        "--bench",
+        action="store_true",
+        help="run only the benchmarks in tests/bench",
+    )
+    group.addoption(
+        "--bench-rows",
+        default="1k",
+        help="comma-separated sizes of the todo table to benchmark, "
+        "e.g. 1k,100k,1M (default: 1k)",
+    )
+    group.addoption(
+        "--bench-rounds",
+        type=int,
+        default=50,
+        help="timed calls per benchmark (default: 50)",
+    )
+    group.addoption(
+        "--bench-baseline",
+        default=os.path.join(os.path.dirname(__file__), "bench/baseline.json"),
+        help="the JSON file of baseline timings, recorded on this machine "
+        "and not committed (default: tests/bench/baseline.json)",
+    )
+    group.addoption(
+        "--bench-tolerance",
+        type=float,
+        default=0.25,
+        help="fail a benchmark whose minimum is this fraction slower than "
+        "its baseline (default: 0.25)",
+    )
+    group.addoption(
+        "--bench-floor",
+        type=float,
+        default=0.2,
+        help="milliseconds a benchmark may be slower than its baseline on "
+        "top of the tolerance (default: 0.2)",
+    )
+    group.addoption(
+        "--bench-update-baseline",
+        action="store_true",
+        help="write the timings to the baseline instead of checking them",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "query_budget(max_queries): fail if a request made through a "
+        "TestClient issues more than max_queries SQL statements",
+    )
+    config.addinivalue_line(
+        "markers", "bench: a benchmark, only run with --bench"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    # The benchmarks seed large tables, so they never share a run with the
+    # tests.
+    bench = config.getoption("--bench")
+    if not bench:
+        skip = pytest.mark.skip(reason="benchmarks only run with --bench")
+        for item in items:
+            if item.get_closest_marker("bench") is not None:
+                item.add_marker(skip)
+        return
+
+    selected, deselected = [], []
+    for item in items:
+        if item.get_closest_marker("bench") is not None:
+            selected.append(item)
+        else:
+            deselected.append(item)
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+
+
+@pytest.fixture(autouse=True)
+def query_budget(request, monkeypatch):
+    """
+    Enforce the ``query_budget`` marker of a test.
+
+    Every request made through a TestClient is counted on its own, so the
+    statements the test runs to set up its data don't count.
+
+    Yields:
+        The method, url and statement count of every request made.
+    """
+    marker = request.node.get_closest_marker("query_budget")
+    requests = []
+    if marker is None:
+        yield requests
+        return
+
+    budget = marker.args[0]
+    send = TestClient.request
+
+    def counted_request(self, method, url, *args, **kwargs):
+        with count_queries() as counter:
+            response = send(self, method, url, *args, **kwargs)
+        requests.append((method, str(url), counter.count))
+        assert counter.count <= budget, (
+            f"{method} {url} issued {counter.count} SQL statements, "
+            f"over the budget of {budget}:\n" + "\n".join(counter.statements)
+        )
+        return response
+
+    monkeypatch.setattr(TestClient, "request", counted_request)
+    yield requests
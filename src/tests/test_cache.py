@@ -0,0 +1,97 @@
+"""
+This file contains the tests for the CRUD cache.
+"""
+
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session
+
+from config.database import engine
+from crud.cache import LRUCache
+from crud.todo import todo as todo_crud
+from main import app
+from schemas.todo import TodoCreate
+
+client = TestClient(app)
+
+
+def test_lru_cache_eviction():
+    """
+    GIVEN a full LRU cache
+    WHEN a new key is stored
+    THEN the least recently used key is evicted
+    """
+    cache = LRUCache(maxsize=2)
+    cache.set("a", {"value": 1})
+    cache.set("b", {"value": 2})
+    cache.get("a")
+    cache.set("c", {"value": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"value": 1}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_cache_ttl():
+    """
+    GIVEN a cached key
+    WHEN its TTL has passed
+    THEN the key is a miss
+    """
+    cache = LRUCache(ttl=10)
+    with patch("crud.cache.time.monotonic", return_value=100):
+        cache.set("a", {"value": 1})
+    with patch("crud.cache.time.monotonic", return_value=111):
+        assert cache.get("a") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_invalidated_on_update(db):
+    """
+    GIVEN a cached Todo
+    WHEN it is updated and then deleted
+    THEN reads never return the stale cached version
+    """
+    todo = todo_crud.create(
+        db, TodoCreate(title="Test todo", description="Test description")
+    )
+    client.get(f"/api/tasks/{todo.id}")
+
+    client.put(
+        f"/api/tasks/{todo.id}",
+        json={"title": "Cached todo updated", "description": None},
+    )
+    response = client.get(f"/api/tasks/{todo.id}")
+    assert response.json()["title"] == "Cached todo updated"
+
+    client.delete(f"/api/tasks/{todo.id}")
+    assert client.get(f"/api/tasks/{todo.id}").status_code == 404
+
+
+def test_cache_not_filled_with_stale_read(db):
+    """
+    GIVEN a Todo updated by another session while a read of it is running
+    WHEN the read fills the cache
+    THEN the row it read isn't cached, and the next read gets the update
+    """
+    todo = todo_crud.create(
+        db, TodoCreate(title="Test todo", description="Test description")
+    )
+
+    def write_after_select(state):
+        # Run the SELECT, then commit a write before the row is cached.
+        if not state.is_select:
+            return None
+        event.remove(db, "do_orm_execute", write_after_select)
+        result = state.invoke_statement().freeze()
+        with Session(engine) as other:
+            todo_crud.update(other, todo.id, {"title": "Test todo updated"})
+        return result()
+
+    event.listen(db, "do_orm_execute", write_after_select)
+
+    assert todo_crud.get(db, todo.id).title == "Test todo"
+    response = client.get(f"/api/tasks/{todo.id}")
+    assert response.json()["title"] == "Test todo updated"
@@ -0,0 +1,37 @@
+"""
+This file contains the tests for the database configuration.
+"""
+
+from config.database import get_async_url
+
+
+def test_get_async_url():
+    """
+    GIVEN sync database urls
+    WHEN get_async_url is called
+    THEN the urls use the async driver of their dialect
+    """
+    assert (
+        get_async_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+    )
+    assert (
+        get_async_url("postgresql://user:pass@db:5432/todo")
+        == "postgresql+asyncpg://user:pass@db:5432/todo"
+    )
+    assert (
+        get_async_url("postgresql+psycopg2://user:pass@db/todo")
+        == "postgresql+asyncpg://user:pass@db/todo"
+    )
+
+
+def test_get_async_url_unchanged():
+    """
+    GIVEN urls that are already async or have no known async driver
+    WHEN get_async_url is called
+    THEN the urls are returned unchanged
+    """
+    assert (
+        get_async_url("sqlite+aiosqlite:///./test.db")
+        == "sqlite+aiosqlite:///./test.db"
+    )
+    assert get_async_url("mysql://db/todo") == "mysql://db/todo"
@@ -2,26 +2,32 @@
 This file contains the tests for the GraphQL API.
 """
 
+import base64
+import hashlib
+import json
 from uuid import uuid4
 
+import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 
-from config.database import get_db
+from config.database import async_engine
 from crud.todo import todo as todo_crud
+from graphql_api.lazy import LazyGraphQLApp
 from main import app
 from schemas.todo import TodoCreate
 
 client = TestClient(app)
 
 
-def test_get_all_todos():
+@pytest.mark.query_budget(2)
+def test_get_all_todos(db):
     """
     GIVEN a TodoCreate object
     WHEN a GET request is made to the /graphql endpoint
     THEN a 200 status code and a list of Todo objects is returned
     """
-    db = get_db()
-
     todo = TodoCreate(title="Test todo", description="Test description")
     todo_crud.create(db, todo)
 
@@ -44,14 +50,13 @@ def test_get_all_todos():
     assert data.get("data").get("getAllTodos").get("total") > 0
 
 
-def test_get_todo():
+@pytest.mark.query_budget(1)
+def test_get_todo(db):
     """
     GIVEN a TodoCreate object
     WHEN a GET request is made to the /graphql endpoint
     THEN a 200 status code and the Todo object is returned
     """
-    db = get_db()
-
     todo = TodoCreate(title="Test todo", description="Test description")
     todo = todo_crud.create(db, todo)
 
@@ -72,6 +77,7 @@ def test_get_todo():
     assert data["data"]["getTodo"]["id"] == str(todo.id)
 
 
+@pytest.mark.query_budget(1)
 def test_get_todo_not_found():
     """
     GIVEN a TodoCreate object
@@ -95,6 +101,7 @@ def test_get_todo_not_found():
     assert data["data"]["getTodo"] is None
 
 
+@pytest.mark.query_budget(2)
 def test_create_todo():
     """
     GIVEN a TodoCreate object
@@ -118,14 +125,13 @@ def test_create_todo():
     assert data["data"]["createTodo"]["title"] == "Nuevo Todo"
 
 
-def test_update_todo():
+@pytest.mark.query_budget(1)
+def test_update_todo(db):
     """
     GIVEN a TodoCreate object
     WHEN a PUT request is made to the /graphql endpoint
     THEN a 200 status code and the Todo object is returned
     """
-    db = get_db()
-
     todo = TodoCreate(title="Test todo", description="Test description")
     todo = todo_crud.create(db, todo)
 
@@ -146,6 +152,7 @@ def test_update_todo():
     assert data["data"]["updateTodo"]["title"] == "Test todo updated"
 
 
+@pytest.mark.query_budget(1)
 def test_update_todo_not_found():
     """
     GIVEN a TodoCreate object
@@ -169,14 +176,13 @@ def test_update_todo_not_found():
     assert data["data"]["updateTodo"] is None
 
 
-def test_delete_todo():
+@pytest.mark.query_budget(1)
+def test_delete_todo(db):
     """
     GIVEN a TodoCreate object
     WHEN a DELETE request is made to the /graphql endpoint
     THEN a 200 status code and the Todo object is returned
     """
-    db = get_db()
-
     todo = TodoCreate(title="Test todo", description="Test description")
     todo = todo_crud.create(db, todo)
 
@@ -197,6 +203,7 @@ def test_delete_todo():
     assert data["data"]["deleteTodo"]["id"] == str(todo.id)
 
 
+@pytest.mark.query_budget(1)
 def test_delete_todo_not_found():
     """
     GIVEN a TodoCreate object
@@ -218,3 +225,254 @@ def test_delete_todo_not_found():
     data = response.json()
     assert response.status_code == 200
     assert data["data"]["deleteTodo"] is None
+
+
+@pytest.mark.query_budget(1)
+def test_get_todos_batched(db):
+    """
+    GIVEN several Todo objects
+    WHEN aliased getTodo fields and a getTodos field are requested together
+    THEN every lookup is resolved with a single SELECT
+    """
+    todos = [
+        todo_crud.create(
+            db, TodoCreate(title=f"Todo {i}", description="Test description")
+        )
+        for i in range(3)
+    ]
+    missing_id = uuid4()
+    aliases = "\n".join(
+        f'todo{i}: getTodo(todoId: "{todo.id}") {{ id }}'
+        for i, todo in enumerate(todos)
+    )
+    ids = ", ".join(f'"{id}"' for id in [todos[0].id, missing_id])
+    query = f"""
+    query {{
+      {aliases}
+      getTodos(ids: [{ids}]) {{ id }}
+    }}
+    """
+    todo_crud.cache.clear()
+
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = async_engine.sync_engine
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        response = client.post("/api/graphql", json={"query": query})
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    data = response.json()["data"]
+    assert [data[f"todo{i}"]["id"] for i in range(3)] == [
+        str(todo.id) for todo in todos
+    ]
+    assert data["getTodos"] == [{"id": str(todos[0].id)}, None]
+    assert len(statements) == 1
+
+
+@pytest.mark.query_budget(2)
+def test_persisted_query():
+    """
+    GIVEN a query only known by its sha256 hash
+    WHEN it is sent before and after the full query has been registered
+    THEN the server first asks for the query and then runs it from its hash
+    """
+    query = "query PersistedTotal { getAllTodos { total } }"
+    extensions = {
+        "persistedQuery": {
+            "version": 1,
+            "sha256Hash": hashlib.sha256(query.encode()).hexdigest(),
+        }
+    }
+
+    response = client.post("/api/graphql", json={"extensions": extensions})
+    errors = response.json()["errors"]
+    assert errors[0]["message"] == "PersistedQueryNotFound"
+
+    response = client.post(
+        "/api/graphql", json={"query": query, "extensions": extensions}
+    )
+    assert response.json()["data"]["getAllTodos"]["total"] >= 0
+
+    response = client.get(
+        "/api/graphql", params={"extensions": json.dumps(extensions)}
+    )
+    assert response.json()["data"]["getAllTodos"]["total"] >= 0
+
+
+def test_persisted_query_hash_mismatch():
+    """
+    GIVEN a query sent along with the hash of another query
+    WHEN a POST request is made to the /graphql endpoint
+    THEN a 400 status code is returned
+    """
+    extensions = {"persistedQuery": {"version": 1, "sha256Hash": "0" * 64}}
+
+    response = client.post(
+        "/api/graphql",
+        json={"query": "{ getAllTodos { total } }", "extensions": extensions},
+    )
+
+    assert response.status_code == 400
+
+
+def test_query_alias_limit():
+    """
+    GIVEN a query with more aliases than the alias limit
+    WHEN a POST request is made to the /graphql endpoint
+    THEN the query is rejected before execution
+    """
+    aliases = " ".join(f"total{i}: getAllTodos {{ total }}" for i in range(101))
+
+    response = client.post("/api/graphql", json={"query": f"{{ {aliases} }}"})
+
+    data = response.json()
+    assert data["data"] is None
+    assert data["errors"][0]["message"] == "101 aliases found. Allowed: 100"
+
+
+def test_query_cost_limit():
+    """
+    GIVEN a query whose pages would resolve too many fields
+    WHEN a POST request is made to the /graphql endpoint
+    THEN the query is rejected before execution
+    """
+    page = "getAllTodos(limit: 1000) { data { id title description } }"
+    query = "{ " + " ".join(f"page{i}: {page}" for i in range(3)) + " }"
+
+    response = client.post("/api/graphql", json={"query": query})
+
+    data = response.json()
+    assert data["data"] is None
+    assert "exceeds maximum operation cost" in data["errors"][0]["message"]
+
+
+def test_query_cost_limit_variable():
+    """
+    GIVEN pages whose limit is set by a variable
+    WHEN a POST request is made to the /graphql endpoint
+    THEN they are costed with the value of the variable before execution
+    """
+    query = (
+        "query ($limit: Int!) { getAllTodos(limit: $limit) "
+        "{ data { id title description isCompleted version } } }"
+    )
+    pages = " ".join(
+        f"page{i}: getAllTodos(limit: $limit) {{ data {{ id title }} }}"
+        for i in range(3)
+    )
+
+    small = client.post(
+        "/api/graphql", json={"query": query, "variables": {"limit": 5}}
+    )
+    large = client.post(
+        "/api/graphql",
+        json={
+            "query": f"query ($limit: Int!) {{ {pages} }}",
+            "variables": {"limit": 1000},
+        },
+    )
+
+    assert "errors" not in small.json()
+    data = large.json()
+    assert data["data"] is None
+    assert data["errors"][0]["message"] == (
+        "'anonymous' exceeds maximum operation cost of 5000 (6006)"
+    )
+
+
+@pytest.mark.query_budget(2)
+def test_lazy_graphql_app():
+    """
+    GIVEN an app serving GraphQL through the fast-boot lazy endpoint
+    WHEN GET and POST queries are sent to it
+    THEN the GraphQL router is built on the first one and answers both
+    """
+    lazy = LazyGraphQLApp()
+    lazy_app = FastAPI()
+    lazy_app.add_route("/graphql", lazy, methods=["GET", "POST"])
+    lazy_client = TestClient(lazy_app)
+    query = "query { getAllTodos(limit: 1) { total } }"
+
+    assert lazy._router is None
+    response = lazy_client.post("/graphql", json={"query": query})
+    assert response.status_code == 200
+    assert "total" in response.json()["data"]["getAllTodos"]
+    assert lazy._router is not None
+
+    response = lazy_client.get("/graphql", params={"query": query})
+    assert response.status_code == 200
+    assert "total" in response.json()["data"]["getAllTodos"]
+
+
+@pytest.mark.query_budget(2)
+def test_search_todos(db):
+    """
+    GIVEN a Todo object with a unique word in its title
+    WHEN the searchTodos query is sent for that word
+    THEN the Todo is returned
+    """
+    word = f"graphql{uuid4().hex}"
+    todo = todo_crud.create(db, TodoCreate(title=word, description=None))
+
+    query = (
+        f'query {{ searchTodos(query: "{word}") {{ total data {{ id }} }} }}'
+    )
+    response = client.post("/api/graphql", json={"query": query})
+    assert response.json()["data"]["searchTodos"] == {
+        "total": 1,
+        "data": [{"id": str(todo.id)}],
+    }
+
+
+@pytest.mark.query_budget(2)
+def test_update_todo_conflict(db):
+    """
+    GIVEN a Todo object updated since a client read its version
+    WHEN the updateTodo mutation is sent with that version
+    THEN a CONFLICT error is returned and the newer version applies
+    """
+    todo = todo_crud.create(db, TodoCreate(title="Test todo", description=None))
+    version = todo.version
+    todo_crud.update(db, todo.id, {"title": "First"})
+
+    mutation = f"""
+      mutation {{
+        updateTodo(
+          todoId: "{todo.id}",
+          todo: {{ title: "Second", description: null, version: {version} }}
+        ) {{ title version }}
+      }}
+    """
+    data = client.post("/api/graphql", json={"query": mutation}).json()
+    assert data["data"] == {"updateTodo": None}
+    assert data["errors"][0]["extensions"] == {
+        "code": "CONFLICT",
+        "expectedVersion": version,
+        "currentVersion": version + 1,
+    }
+
+    mutation = mutation.replace(
+        f"version: {version} ", f"version: {version + 1} "
+    )
+    data = client.post("/api/graphql", json={"query": mutation}).json()
+    assert data["data"]["updateTodo"] == {"title": "Second", "version": 3}
+
+
+def test_get_all_todos_invalid_cursor():
+    """
+    GIVEN a well-formed cursor payload with non-string values
+    WHEN the getAllTodos query is made with it
+    THEN only the generic invalid cursor error is returned
+    """
+    cursor = base64.urlsafe_b64encode(b"[1, 2]").decode()
+    query = f'{{ getAllTodos(cursor: "{cursor}") {{ total }} }}'
+
+    response = client.post("/api/graphql", json={"query": query})
+
+    data = response.json()
+    assert [error["message"] for error in data["errors"]] == ["Invalid cursor"]
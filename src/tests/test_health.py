@@ -0,0 +1,47 @@
+"""
+This file contains the tests for the health endpoints.
+"""
+
+from fastapi.testclient import TestClient
+
+from crud.todo import todo as todo_crud
+from main import app
+from schemas.todo import TodoCreate
+
+client = TestClient(app)
+
+
+def test_db_health():
+    """
+    GIVEN requests that use database sessions
+    WHEN a GET request is made to the /api/health/db endpoint
+    THEN every connection has been returned to its pool
+    """
+    client.get("/api/tasks")
+    client.post("/api/graphql", json={"query": "{ getAllTodos { total } }"})
+
+    response = client.get("/api/health/db")
+
+    data = response.json()
+    assert response.status_code == 200
+    assert data["sync"]["checkedout"] == 0
+    assert data["async"]["checkedout"] == 0
+
+
+def test_cache_health(db):
+    """
+    GIVEN a Todo read twice
+    WHEN a GET request is made to the /api/health/cache endpoint
+    THEN the second read is counted as a cache hit
+    """
+    todo = todo_crud.create(
+        db, TodoCreate(title="Test todo", description="Test description")
+    )
+    before = client.get("/api/health/cache").json()["todo"]
+
+    client.get(f"/api/tasks/{todo.id}")
+    client.get(f"/api/tasks/{todo.id}")
+
+    after = client.get("/api/health/cache").json()["todo"]
+    assert after["misses"] == before["misses"] + 1
+    assert after["hits"] == before["hits"] + 1
@@ -0,0 +1,53 @@
+"""
+This file contains the tests for the primary key strategies.
+"""
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+from models.ids import get_id_factory, uuid4, uuid7
+
+
+def test_uuid7_layout():
+    """
+    GIVEN a new UUIDv7
+    WHEN its fields are read
+    THEN it has version 7, the RFC variant and the current time
+    """
+    before = time.time_ns() // 1_000_000
+    id = uuid7()
+    after = time.time_ns() // 1_000_000
+
+    assert id.version == 7
+    assert id.variant == "specified in RFC 4122"
+    assert before <= id.int >> 80 <= after
+
+
+def test_uuid7_ordered():
+    """
+    GIVEN many UUIDv7 generated in a row
+    WHEN they are compared
+    THEN they are strictly increasing, also as hex strings
+    """
+    ids = [uuid7() for _ in range(10_000)]
+
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert [id.hex for id in ids] == sorted(id.hex for id in ids)
+
+
+def test_get_id_factory():
+    """
+    GIVEN the ID_STRATEGY environment variable
+    WHEN the id factory is selected
+    THEN the matching strategy is returned and unknown ones are rejected
+    """
+    with patch.dict("os.environ", {"ID_STRATEGY": "uuid4"}):
+        assert get_id_factory() is uuid4
+    with patch.dict("os.environ", {}, clear=True):
+        assert get_id_factory() is uuid7
+    with patch.dict("os.environ", {"ID_STRATEGY": "serial"}):
+        with pytest.raises(ValueError):
+            get_id_factory()
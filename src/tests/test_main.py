@@ -2,6 +2,9 @@
 This file contains the tests for the main file.
 """
 
+import os
+import subprocess
+import sys
 from unittest.mock import patch
 
 from fastapi.testclient import TestClient
@@ -31,3 +34,25 @@ def test_root():
     response = client.get("/")
     assert response.status_code == 200
     assert response.json() == {"message": "Go to /docs"}
+
+
+def test_fast_boot_defers_graphql():
+    """
+    GIVEN fast-boot mode
+    WHEN main is imported in a fresh interpreter
+    THEN strawberry isn't imported until the first GraphQL request
+    """
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, main; print('strawberry' in sys.modules)",
+        ],
+        env={**os.environ, "FAST_BOOT": "1"},
+        cwd=os.path.dirname(os.path.dirname(__file__)),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,161 @@
+"""
+This file contains the tests for the Prometheus metrics.
+"""
+
+import re
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+
+from crud.todo import todo as todo_crud
+from main import app
+from monitoring.queries import count_queries
+
+client = TestClient(app)
+
+
+def get_samples() -> str:
+    """
+    Scrape the /metrics endpoint.
+    """
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    return response.text
+
+
+def test_http_metrics():
+    """
+    GIVEN requests to routes with path parameters
+    WHEN the /metrics endpoint is scraped
+    THEN their latency is labelled with the route template
+    """
+    client.get(f"/api/tasks/{uuid4()}")
+
+    samples = get_samples()
+
+    assert (
+        'http_request_duration_seconds_count{method="GET",'
+        'route="/api/tasks/{todo_id}",status="404"}'
+    ) in samples
+
+
+def test_graphql_metrics():
+    """
+    GIVEN a named GraphQL operation
+    WHEN the /metrics endpoint is scraped
+    THEN its latency is labelled with the operation name
+    """
+    query = "query MetricsTest { getAllTodos(limit: 1) { total } }"
+    client.post("/api/graphql", json={"query": query})
+
+    samples = get_samples()
+
+    assert (
+        'graphql_operation_duration_seconds_count{operation="MetricsTest",'
+        'status="ok",type="query"} 1.0'
+    ) in samples
+
+
+def test_graphql_metrics_invalid():
+    """
+    GIVEN operations whose document doesn't parse or doesn't define the
+    operation name they are sent with
+    WHEN the /metrics endpoint is scraped
+    THEN their latency is labelled invalid, not with the name sent
+    """
+    for i in range(3):
+        client.post(
+            "/api/graphql",
+            json={"query": "{ nope", "operationName": f"Random{i}"},
+        )
+    client.post(
+        "/api/graphql",
+        json={
+            "query": "query Defined { getAllTodos(limit: 1) { total } }",
+            "operationName": "Undefined",
+        },
+    )
+
+    samples = get_samples()
+
+    assert "Random" not in samples
+    assert "Undefined" not in samples
+    assert 'graphql_operation_duration_seconds_count{operation="invalid"' in (
+        samples
+    )
+
+
+def test_db_metrics():
+    """
+    GIVEN requests that query the database
+    WHEN the /metrics endpoint is scraped
+    THEN the statements and the pool gauges of both engines are reported
+    """
+    client.get("/api/tasks")
+    client.post("/api/tasks", json={"title": "Metrics", "description": None})
+
+    samples = get_samples()
+
+    assert 'db_query_duration_seconds_count{engine="async",verb="SELECT"}' in (
+        samples
+    )
+    assert 'db_rows_affected_total{engine="async",verb="INSERT"}' in samples
+    assert 'db_pool_checkedout{engine="sync"} 0.0' in samples
+    assert 'db_pool_checkedout{engine="async"} 0.0' in samples
+
+
+def test_db_metrics_failed_statement(db):
+    """
+    GIVEN a statement failing on a connection
+    WHEN the connection runs another one
+    THEN the start time of the failed one isn't left on the connection
+    """
+    connection = db.connection()
+    with pytest.raises(OperationalError):
+        connection.exec_driver_sql("SELECT * FROM missing_table")
+    connection.exec_driver_sql("SELECT 1")
+
+    assert "query_start" not in connection.info
+
+
+def test_count_queries(db):
+    """
+    GIVEN a block counting the queries of the application engines
+    WHEN statements run inside and after the block
+    THEN only the statements run inside it are recorded
+    """
+    with count_queries() as counter:
+        todo_crud.get(db, uuid4())
+        client.get("/api/tasks")
+
+    todo_crud.get(db, uuid4())
+
+    assert counter.count == 3
+    assert all(
+        statement.lstrip().upper().startswith("SELECT")
+        for statement in counter.statements
+    )
+
+
+def test_http_metrics_unmatched():
+    """
+    GIVEN requests matching no route, including trailing-slash redirects
+    WHEN the /metrics endpoint is scraped
+    THEN they share a single unmatched label instead of their raw paths
+    """
+    for _ in range(3):
+        client.get(f"/api/tasks/{uuid4()}/", follow_redirects=False)
+    client.request("PROPFIND", "/api/tasks")
+
+    samples = get_samples()
+
+    assert not re.search(r'route="/api/tasks/[0-9a-f]', samples)
+    assert (
+        'http_request_duration_seconds_count{method="GET",'
+        'route="unmatched",status="307"}'
+    ) in samples
+    assert 'method="OTHER"' in samples
+    assert 'route="/metrics"' in get_samples()
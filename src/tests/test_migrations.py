@@ -0,0 +1,116 @@
+"""
+This file contains the tests for the schema migrations.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+import migrations.runner
+from migrations.runner import Migration, get_migrations, run_migrations
+
+
+def test_run_migrations(tmp_path):
+    """
+    GIVEN an empty database
+    WHEN the migrations run twice
+    THEN every migration is applied once and recorded
+    """
+    engine = create_engine(f"sqlite:///{tmp_path}/migrate.db")
+    versions = [migration.version for migration in get_migrations()]
+
+    assert run_migrations(engine) == versions
+    assert run_migrations(engine) == []
+
+    with engine.connect() as connection:
+        recorded = connection.execute(
+            text("SELECT version FROM schema_version ORDER BY version")
+        ).scalars()
+        assert list(recorded) == versions
+
+    indexes = {index["name"] for index in inspect(engine).get_indexes("todo")}
+    assert indexes == {
+        "ix_todo_active_created",
+        "ix_todo_active_completed_created",
+        "ix_todo_active_title",
+        "ix_todo_inactive",
+        "ix_todo_completed_updated",
+    }
+
+
+def test_run_migrations_existing_table(tmp_path):
+    """
+    GIVEN a database created before migrations existed
+    WHEN the migrations run
+    THEN the existing rows are kept and get the new columns
+    """
+    engine = create_engine(f"sqlite:///{tmp_path}/legacy.db")
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE todo (id CHAR(32) PRIMARY KEY, "
+                "is_active BOOLEAN NOT NULL, title VARCHAR NOT NULL, "
+                "description VARCHAR, is_completed BOOLEAN NOT NULL)"
+            )
+        )
+        connection.execute(text("CREATE INDEX ix_todo_id ON todo (id)"))
+        connection.execute(
+            text("INSERT INTO todo VALUES ('a', 1, 'Legacy', NULL, 0)")
+        )
+
+    run_migrations(engine)
+
+    with engine.connect() as connection:
+        row = connection.execute(text("SELECT * FROM todo")).mappings().one()
+    assert row["title"] == "Legacy"
+    assert row["version"] == 1
+    assert row["date_created"] is not None
+    assert row["date_updated"] is not None
+    indexes = {index["name"] for index in inspect(engine).get_indexes("todo")}
+    assert "ix_todo_id" not in indexes
+
+
+def test_run_migrations_failed(tmp_path, monkeypatch):
+    """
+    GIVEN a migration creating a table and then failing
+    WHEN the migrations run on SQLite
+    THEN none of them is applied or recorded, and they apply once fixed
+    """
+    engine = create_engine(f"sqlite:///{tmp_path}/failed.db")
+
+    def upgrade(connection):
+        connection.execute(text("CREATE TABLE broken (id INTEGER)"))
+        raise RuntimeError("Migration failed")
+
+    broken = Migration(999, "broken", SimpleNamespace(upgrade=upgrade))
+    monkeypatch.setattr(
+        migrations.runner, "get_migrations", lambda: [*get_migrations(), broken]
+    )
+
+    with pytest.raises(RuntimeError):
+        run_migrations(engine)
+
+    tables = inspect(engine).get_table_names()
+    assert "todo" not in tables
+    assert "broken" not in tables
+    monkeypatch.undo()
+    versions = [migration.version for migration in get_migrations()]
+    assert run_migrations(engine) == versions
+
+
+def test_run_migrations_concurrent(tmp_path):
+    """
+    GIVEN an empty SQLite database
+    WHEN two instances boot and run the migrations at the same time
+    THEN one applies them all and the other finds nothing to apply
+    """
+    url = f"sqlite:///{tmp_path}/concurrent.db"
+    engines = [create_engine(url) for _ in range(2)]
+    versions = [migration.version for migration in get_migrations()]
+
+    with ThreadPoolExecutor(2) as executor:
+        applied = list(executor.map(run_migrations, engines))
+
+    assert sorted(applied) == [[], versions]
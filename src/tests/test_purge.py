@@ -0,0 +1,119 @@
+"""
+This file contains the tests for the purge job.
+"""
+
+from datetime import timedelta
+
+from fastapi.testclient import TestClient
+from sqlmodel import select, update
+
+from crud.todo import todo as todo_crud
+from jobs.purge import PurgeJob
+from main import app
+from models.base import utcnow
+from models.todo import Todo, TodoArchive
+from schemas.todo import TodoCreate
+
+client = TestClient(app)
+
+
+def create_todos(db):
+    """
+    Create a live, a soft-deleted, a recently and a long completed Todo.
+    """
+    live, deleted, recent, old = [
+        todo_crud.create(
+            db,
+            TodoCreate(
+                title=f"Purge {i}", description=None, is_completed=i > 1
+            ),
+        )
+        for i in range(4)
+    ]
+    todo_crud.delete(db, deleted.id)
+    old.date_updated = utcnow() - timedelta(days=31)
+    db.add(old)
+    db.commit()
+    return live, deleted, recent, old
+
+
+def test_purge_archive(db):
+    """
+    GIVEN live, soft-deleted and completed Todo objects
+    WHEN the purge job runs in archive mode with small batches
+    THEN the soft-deleted and long completed ones move to the archive
+    """
+    live, deleted, recent, old = [todo.id for todo in create_todos(db)]
+    job = PurgeJob(archive=True, completed_days=30, batch_size=1)
+
+    purged = job.run()
+
+    ids = [live, deleted, recent, old]
+    remaining = db.exec(select(Todo.id).where(Todo.id.in_(ids))).all()
+    assert set(remaining) == {live, recent}
+    archived = db.exec(select(TodoArchive).where(TodoArchive.id.in_(ids)))
+    archived = {todo.id: todo for todo in archived}
+    assert set(archived) == {deleted, old}
+    assert archived[old].title == "Purge 3"
+    assert archived[deleted].is_active is False
+
+    stats = job.stats()
+    assert purged >= 2
+    assert stats["purged"] == stats["last_purged"] == purged
+    assert stats["batches"] == purged
+    assert stats["runs"] == 1
+    assert stats["running"] is False
+    assert stats["last_error"] is None
+
+
+def test_purge_delete(db):
+    """
+    GIVEN a soft-deleted and a long completed Todo object
+    WHEN the purge job runs in delete mode, keeping completed todos
+    THEN only the soft-deleted one is removed, and isn't archived
+    """
+    _, deleted, _, old = [todo.id for todo in create_todos(db)]
+    job = PurgeJob(archive=False, completed_days=None)
+
+    job.run()
+
+    db.expunge_all()
+    assert db.get(Todo, deleted) is None
+    assert db.get(TodoArchive, deleted) is None
+    assert db.get(Todo, old) is not None
+
+
+def test_purge_changed_since_selected(db):
+    """
+    GIVEN a soft-deleted Todo object selected for purging
+    WHEN it is restored before the purge removes it
+    THEN it is neither archived nor removed
+    """
+    todo = todo_crud.create(db, TodoCreate(title="Purge", description=None))
+    todo_crud.delete(db, todo.id)
+    condition = Todo.is_active == False  # noqa E712
+    ids = db.exec(select(Todo.id).where(condition)).all()
+    db.exec(update(Todo).where(Todo.id == todo.id).values(is_active=True))
+    db.commit()
+
+    purged = todo_crud.purge(db, ids, TodoArchive, condition)
+
+    db.expunge_all()
+    assert todo.id in ids
+    assert db.get(Todo, todo.id) is not None
+    assert db.get(TodoArchive, todo.id) is None
+    assert purged == len(ids) - 1
+
+
+def test_purge_health():
+    """
+    GIVEN the application purge job
+    WHEN a GET request is made to the /api/health/purge endpoint
+    THEN its counters are returned
+    """
+    response = client.get("/api/health/purge")
+
+    data = response.json()
+    assert response.status_code == 200
+    assert data["mode"] == "archive"
+    assert data["runs"] == 0
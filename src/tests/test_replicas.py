@@ -0,0 +1,188 @@
+"""
+This file contains the tests for the read replica routing.
+
+The replica is a second SQLite file with the same schema that nothing
+replicates to, so a read served by it doesn't see the writes made on the
+primary.
+"""
+
+import tempfile
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session
+
+import config.database
+from config.database import async_session, engine
+from config.replicas import (
+    READ_YOUR_WRITES_COOKIE,
+    ReadYourWritesMiddleware,
+    RoutingSession,
+)
+from crud.cache import LRUCache
+from crud.todo import todo as todo_crud
+from migrations.runner import run_migrations
+from models.todo import Todo
+from router import api_router
+from schemas.todo import TodoCreate
+
+GET_TODO = "query ($id: UUID!) { getTodo(todoId: $id) { id title } }"
+
+
+@pytest.fixture(scope="module")
+def replica_url():
+    """
+    Create the schema in an empty SQLite file standing in for a replica.
+    """
+    url = f"sqlite:///{tempfile.mkdtemp()}/replica.db"
+    replica = create_engine(url)
+    run_migrations(replica)
+    replica.dispose()
+    return url
+
+
+@pytest.fixture
+def replica(replica_url, monkeypatch):
+    """
+    Route the reads of the application sessions to the replica.
+
+    Yields:
+        The sync engine of the replica.
+    """
+    sync_replica = create_engine(replica_url)
+    async_replica = create_async_engine(
+        replica_url.replace("sqlite://", "sqlite+aiosqlite://")
+    )
+    monkeypatch.setattr(config.database, "read_engines", [sync_replica])
+    monkeypatch.setitem(
+        async_session.kw, "replicas", [async_replica.sync_engine]
+    )
+    # A cached read would hide where the query went.
+    monkeypatch.setattr(todo_crud, "cache", None)
+    yield sync_replica
+    sync_replica.dispose()
+    async_replica.sync_engine.dispose()
+
+
+@pytest.fixture
+def app():
+    """
+    Build an application keeping clients on the primary after they wrote.
+    """
+    app = FastAPI()
+    app.include_router(api_router, prefix="/api")
+    app.add_middleware(ReadYourWritesMiddleware, window=5)
+    return app
+
+
+def test_routing_session(replica):
+    """
+    GIVEN a Todo written through a routing session
+    WHEN it is read back by the same session and by a new one
+    THEN the writer reads it from the primary and the new session from the
+    replica, which doesn't have it
+    """
+    with RoutingSession(
+        engine, expire_on_commit=False, replicas=[replica]
+    ) as db:
+        todo = todo_crud.create(
+            db, TodoCreate(title="Test todo", description="Test description")
+        )
+        assert todo_crud.get(db, todo.id) is not None
+
+    with RoutingSession(engine, replicas=[replica]) as db:
+        assert todo_crud.get(db, todo.id) is None
+        assert todo_crud.all(db)["total"] == 0
+        todo_crud.update(db, todo.id, {"title": "Test todo updated"})
+
+    with RoutingSession(engine) as db:
+        assert todo_crud.get(db, todo.id).title == "Test todo updated"
+
+
+def test_read_your_writes(replica, app):
+    """
+    GIVEN a Todo created through the REST API
+    WHEN it is read by the client that created it and by another client
+    THEN the creator reads it from the primary for the window set by its
+    cookie and the other client reads from the replica
+    """
+    writer = TestClient(app)
+    reader = TestClient(app)
+
+    response = writer.post(
+        "/api/tasks",
+        json={"title": "Test todo", "description": "Test description"},
+    )
+    todo_id = response.json()["id"]
+
+    assert response.status_code == 200
+    assert "Max-Age=5" in response.headers["set-cookie"]
+    assert writer.get(f"/api/tasks/{todo_id}").status_code == 200
+    assert reader.get(f"/api/tasks/{todo_id}").status_code == 404
+    assert READ_YOUR_WRITES_COOKIE not in reader.get("/api/tasks").cookies
+
+    reader.cookies.set(READ_YOUR_WRITES_COOKIE, "1")
+    assert reader.get(f"/api/tasks/{todo_id}").status_code == 200
+
+
+def test_graphql_read_your_writes(replica, app):
+    """
+    GIVEN a Todo created by a GraphQL mutation
+    WHEN it is queried by the client that created it and by another client
+    THEN only the creator reads it, from the primary
+    """
+    writer = TestClient(app)
+    reader = TestClient(app)
+
+    response = writer.post(
+        "/api/graphql",
+        json={
+            "query": 'mutation { createTodo(todo: { title: "Test todo", '
+            'description: "Test description" }) { id } }'
+        },
+    )
+    todo_id = response.json()["data"]["createTodo"]["id"]
+
+    def get_todo(client):
+        response = client.post(
+            "/api/graphql",
+            json={"query": GET_TODO, "variables": {"id": todo_id}},
+        )
+        return response.json()["data"]["getTodo"]
+
+    assert READ_YOUR_WRITES_COOKIE in response.cookies
+    assert get_todo(writer)["id"] == todo_id
+    assert get_todo(reader) is None
+
+
+def test_read_your_writes_with_cache(replica, app, monkeypatch):
+    """
+    GIVEN a Todo on the primary and the replica, and a read-through cache
+    WHEN a client updates it, another client reads the stale replica row,
+    and the writer reads it again within its window
+    THEN the writer gets its own write, not the stale row from the cache
+    """
+    monkeypatch.setattr(todo_crud, "cache", LRUCache())
+    with RoutingSession(engine, expire_on_commit=False) as db:
+        todo = todo_crud.create(
+            db, TodoCreate(title="Test todo", description="Test description")
+        )
+    with Session(replica) as db:
+        db.add(Todo(**todo.model_dump()))
+        db.commit()
+    writer = TestClient(app)
+    reader = TestClient(app)
+
+    response = writer.put(
+        f"/api/tasks/{todo.id}",
+        json={"title": "Test todo updated", "description": "Test description"},
+    )
+
+    assert response.status_code == 200
+    assert reader.get(f"/api/tasks/{todo.id}").json()["version"] == 1
+    data = writer.get(f"/api/tasks/{todo.id}").json()
+    assert data["version"] == 2
+    assert data["title"] == "Test todo updated"
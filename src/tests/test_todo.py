@@ -2,11 +2,19 @@
 This file contains the tests for the Todo.
 """
 
+import base64
+import csv
+import io
+import json
 from uuid import uuid4
 
+import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session
 
-from config.database import get_db
+from config.database import async_engine, engine
+from crud.base import VersionConflictError
 from crud.todo import todo as todo_crud
 from main import app
 from schemas.todo import TodoCreate
@@ -14,6 +22,14 @@ from schemas.todo import TodoCreate
 client = TestClient(app)
 
 
+def encode_raw_cursor(payload) -> str:
+    """
+    Encode any JSON payload the way cursors are encoded.
+    """
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+@pytest.mark.query_budget(2)
 def test_create_todo():
     """
     GIVEN a TodoCreate object
@@ -34,14 +50,13 @@ def test_create_todo():
     assert data["description"] == "Test description"
 
 
-def test_get_todos():
+@pytest.mark.query_budget(2)
+def test_get_todos(db):
     """
     GIVEN a TodoCreate object
     WHEN a GET request is made to the /api/tasks endpoint
     THEN a 200 status code and a list of Todo objects is returned
     """
-    db = get_db()
-
     todo = TodoCreate(title="Test todo", description="Test description")
     todo_crud.create(db, todo)
 
@@ -52,14 +67,13 @@ def test_get_todos():
     assert len(data) > 0
 
 
-def test_get_todo():
+@pytest.mark.query_budget(1)
+def test_get_todo(db):
     """
     GIVEN a TodoCreate object
     WHEN a GET request is made to the /api/tasks endpoint
     THEN a 200 status code and the Todo object is returned
     """
-    db = get_db()
-
     todo = TodoCreate(title="Test todo", description="Test description")
     todo = todo_crud.create(db, todo)
 
@@ -71,6 +85,7 @@ def test_get_todo():
     assert data["description"] == "Test description"
 
 
+@pytest.mark.query_budget(1)
 def test_get_todo_not_found():
     """
     GIVEN a TodoCreate object
@@ -83,14 +98,13 @@ def test_get_todo_not_found():
     assert data["detail"] == "Todo not found"
 
 
-def test_update_todo():
+@pytest.mark.query_budget(1)
+def test_update_todo(db):
     """
     GIVEN a TodoCreate object
     WHEN a PUT request is made to the /api/tasks endpoint
     THEN a 200 status code and the Todo object is returned
     """
-    db = get_db()
-
     todo = TodoCreate(title="Test todo", description="Test description")
     todo = todo_crud.create(db, todo)
 
@@ -110,6 +124,7 @@ def test_update_todo():
     assert data["is_completed"] is True
 
 
+@pytest.mark.query_budget(1)
 def test_update_todo_not_found():
     """
     GIVEN a TodoCreate object
@@ -130,14 +145,13 @@ def test_update_todo_not_found():
     assert data["detail"] == "Todo not found"
 
 
-def test_delete_todo():
+@pytest.mark.query_budget(1)
+def test_delete_todo(db):
     """
     GIVEN a TodoCreate object
     WHEN a DELETE request is made to the /api/tasks endpoint
     THEN a 200 status code and the Todo object is returned
     """
-    db = get_db()
-
     todo = TodoCreate(title="Test todo", description="Test description")
     todo = todo_crud.create(db, todo)
 
@@ -149,6 +163,7 @@ def test_delete_todo():
     assert data["description"] == "Test description"
 
 
+@pytest.mark.query_budget(1)
 def test_delete_todo_not_found():
     """
     GIVEN a TodoCreate object
@@ -159,3 +174,751 @@ def test_delete_todo_not_found():
     data = response.json()
     assert response.status_code == 404
     assert data["detail"] == "Todo not found"
+
+
+@pytest.mark.query_budget(2)
+def test_get_todos_pagination(db):
+    """
+    GIVEN several Todo objects
+    WHEN the /api/tasks pages are followed through their next_cursor
+    THEN every Todo is returned exactly once and total counts them all
+    """
+    todos = [TodoCreate(title=f"Todo {i}", description=None) for i in range(3)]
+    created = {str(todo_crud.create(db, todo).id) for todo in todos}
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/tasks", params=params)
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["data"]) <= 2
+        seen.extend(todo["id"] for todo in data["data"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == len(set(seen))
+    assert created <= set(seen)
+    assert data["total"] == len(seen)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not-a-cursor",
+        encode_raw_cursor([1, 2]),
+        encode_raw_cursor([None, None]),
+        encode_raw_cursor(["2024-01-01T00:00:00"]),
+        encode_raw_cursor({"a": "b"}),
+    ],
+)
+def test_get_todos_invalid_cursor(cursor):
+    """
+    GIVEN a malformed cursor
+    WHEN a GET request is made to the /api/tasks endpoint
+    THEN a 400 status code and error message is returned
+    """
+    response = client.get("/api/tasks", params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+@pytest.mark.query_budget(2)
+def test_bulk_create_todos():
+    """
+    GIVEN a list of valid and invalid Todo payloads
+    WHEN a POST request is made to the /api/tasks/bulk endpoint
+    THEN the valid Todos are created and the invalid ones are reported
+    """
+    response = client.post(
+        "/api/tasks/bulk",
+        json=[
+            {"title": "Bulk todo 1", "description": "First"},
+            {"description": "Missing title"},
+            {"title": "Bulk todo 2", "description": None},
+        ],
+    )
+
+    data = response.json()
+    assert response.status_code == 200
+    assert [todo["title"] for todo in data["data"]] == [
+        "Bulk todo 1",
+        "Bulk todo 2",
+    ]
+    assert [error["index"] for error in data["errors"]] == [1]
+
+
+@pytest.mark.query_budget(2)
+def test_bulk_update_todos(db):
+    """
+    GIVEN existing and missing Todo ids
+    WHEN a PATCH request is made to the /api/tasks/bulk endpoint
+    THEN only the given fields of existing Todos change
+    """
+    todo = todo_crud.create(
+        db, TodoCreate(title="Test todo", description="Test description")
+    )
+    missing_id = str(uuid4())
+
+    response = client.patch(
+        "/api/tasks/bulk",
+        json=[
+            {"id": str(todo.id), "is_completed": True},
+            {"id": missing_id, "title": "Nope"},
+        ],
+    )
+
+    data = response.json()
+    assert response.status_code == 200
+    assert data["data"][0]["title"] == "Test todo"
+    assert data["data"][0]["is_completed"] is True
+    assert data["errors"] == [
+        {"index": 1, "id": missing_id, "detail": "Not found"}
+    ]
+
+
+def test_bulk_update_todos_concurrent_write(db):
+    """
+    GIVEN a Todo updated by another session while it is bulk updated
+    WHEN the bulk update writes it
+    THEN both writes are kept and the version counts both
+    """
+    todo = todo_crud.create(
+        db, TodoCreate(title="Test todo", description="Test description")
+    )
+    written = []
+
+    def write_concurrently(*_args):
+        # Commits once, right before the bulk update writes the row.
+        if not written:
+            written.append(True)
+            with Session(engine) as other:
+                todo_crud.update(other, todo.id, {"description": "Concurrent"})
+
+    event.listen(db, "before_flush", write_concurrently)
+    event.listen(
+        db,
+        "do_orm_execute",
+        lambda state: state.is_update and write_concurrently(),
+    )
+
+    data = todo_crud.bulk_update(db, [{"id": todo.id, "title": "Bulk"}])
+
+    assert data["errors"] == []
+    assert data["data"][0].version == 3
+    db.expire_all()
+    stored = todo_crud.get(db, todo.id)
+    assert (stored.title, stored.description) == ("Bulk", "Concurrent")
+    assert stored.version == 3
+
+
+def test_bulk_update_todos_null(db):
+    """
+    GIVEN a bulk update setting a non-nullable field to null
+    WHEN a PATCH request is made to the /api/tasks/bulk endpoint
+    THEN a 422 status code is returned and no Todo changes
+    """
+    todo = todo_crud.create(
+        db, TodoCreate(title="Test todo", description="Test description")
+    )
+
+    response = client.patch(
+        "/api/tasks/bulk",
+        json=[
+            {"id": str(todo.id), "is_completed": True},
+            {"id": str(todo.id), "title": None},
+        ],
+    )
+
+    assert response.status_code == 422
+    db.expire_all()
+    assert todo_crud.get(db, todo.id).is_completed is False
+
+
+@pytest.mark.query_budget(1)
+def test_bulk_delete_todos(db):
+    """
+    GIVEN existing and missing Todo ids
+    WHEN a DELETE request is made to the /api/tasks/bulk endpoint
+    THEN the existing Todos are deleted and the missing ones are reported
+    """
+    todo = todo_crud.create(
+        db, TodoCreate(title="Test todo", description="Test description")
+    )
+    missing_id = str(uuid4())
+
+    response = client.request(
+        "DELETE", "/api/tasks/bulk", json=[str(todo.id), missing_id]
+    )
+
+    data = response.json()
+    assert response.status_code == 200
+    assert [todo["id"] for todo in data["data"]] == [str(todo.id)]
+    assert data["errors"] == [
+        {"index": 1, "id": missing_id, "detail": "Not found"}
+    ]
+    assert client.get(f"/api/tasks/{todo.id}").status_code == 404
+
+
+@pytest.mark.query_budget(1)
+def test_export_todos_ndjson(db):
+    """
+    GIVEN a Todo object
+    WHEN a GET request is made to the /api/tasks/export endpoint
+    THEN every active Todo is streamed as one JSON object per line
+    """
+    todo = todo_crud.create(
+        db, TodoCreate(title="Export todo", description="Test description")
+    )
+
+    response = client.get("/api/tasks/export", params={"format": "ndjson"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert str(todo.id) in {row["id"] for row in rows}
+    assert all(row["is_active"] for row in rows)
+
+
+@pytest.mark.query_budget(1)
+def test_export_todos_csv(db):
+    """
+    GIVEN a Todo object
+    WHEN a GET request is made to the /api/tasks/export endpoint
+    THEN every active Todo is streamed as a CSV row after a header
+    """
+    todo = todo_crud.create(
+        db, TodoCreate(title="Export, todo", description="Test description")
+    )
+
+    response = client.get("/api/tasks/export", params={"format": "csv"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    exported = {row["id"]: row for row in rows}
+    assert exported[str(todo.id)]["title"] == "Export, todo"
+
+
+@pytest.mark.query_budget(3)
+def test_import_todos_ndjson():
+    """
+    GIVEN an NDJSON body with valid, invalid and malformed lines
+    WHEN a POST request is made to the /api/tasks/import endpoint
+    THEN the valid lines are inserted in chunks and the others are reported
+    """
+    body = "\n".join(
+        [
+            json.dumps({"title": "Import 1", "description": "First"}),
+            json.dumps({"title": "Import 2", "description": None}),
+            "{not json",
+            json.dumps({"description": "Missing title"}),
+            json.dumps({"title": "Import 3", "description": "Third"}),
+        ]
+    )
+
+    response = client.post(
+        "/api/tasks/import",
+        params={"format": "ndjson", "chunk_size": 2},
+        content=body,
+    )
+
+    data = response.json()
+    assert response.status_code == 200
+    assert data["inserted"] == 3
+    assert data["rejected"] == 2
+    assert [error["line"] for error in data["errors"]] == [3, 4]
+
+
+def test_import_todos_unreadable_lines(monkeypatch):
+    """
+    GIVEN a body sent in small chunks with a line that isn't valid UTF-8
+    and a line longer than the maximum line size
+    WHEN a POST request is made to the /api/tasks/import endpoint
+    THEN both lines are rejected and the others are inserted
+    """
+    monkeypatch.setattr("api.streaming.MAX_LINE_SIZE", 64)
+    body = b"\n".join(
+        [
+            b'{"title": "Import 1", "description": null}',
+            b"\xff\xfe",
+            b'{"title": "' + b"x" * 100 + b'", "description": null}',
+            b'{"title": "Import 2", "description": null}',
+        ]
+    )
+    chunks = [body[i : i + 10] for i in range(0, len(body), 10)]
+
+    response = client.post("/api/tasks/import", content=iter(chunks))
+
+    data = response.json()
+    assert response.status_code == 200
+    assert data["inserted"] == 2
+    assert data["errors"] == [
+        {"line": 2, "detail": "Invalid UTF-8"},
+        {"line": 3, "detail": "Line too long"},
+    ]
+
+
+@pytest.mark.query_budget(1)
+def test_import_todos_csv():
+    """
+    GIVEN a CSV body with a header line
+    WHEN a POST request is made to the /api/tasks/import endpoint
+    THEN every row is inserted
+    """
+    body = (
+        "title,description,is_completed\r\n"
+        '"Import, csv",First,true\r\n'
+        "Import csv 2,Second,false\r\n"
+    )
+
+    response = client.post(
+        "/api/tasks/import", params={"format": "csv"}, content=body
+    )
+
+    data = response.json()
+    assert response.status_code == 200
+    assert data["inserted"] == 2
+    assert data["rejected"] == 0
+
+
+def test_import_todos_csv_round_trip(db):
+    """
+    GIVEN an exported CSV holding a description over several lines
+    WHEN it is posted to the /api/tasks/import endpoint
+    THEN every row is inserted with its values intact
+    """
+    title = f"Round trip {uuid4()}"
+    description = 'line one\nline "two",\n\nline, four'
+    todo_crud.create(db, TodoCreate(title=title, description=description))
+    exported = client.get("/api/tasks/export", params={"format": "csv"}).text
+    rows = len(list(csv.DictReader(io.StringIO(exported))))
+
+    response = client.post(
+        "/api/tasks/import", params={"format": "csv"}, content=exported
+    )
+
+    data = response.json()
+    assert data["rejected"] == 0, data["errors"]
+    assert data["inserted"] == rows
+    imported = client.get("/api/tasks", params={"title_prefix": title})
+    descriptions = [todo["description"] for todo in imported.json()["data"]]
+    assert descriptions == [description] * 2
+
+
+def test_import_todos_csv_unterminated_quote():
+    """
+    GIVEN a CSV body whose last quoted value is never closed
+    WHEN a POST request is made to the /api/tasks/import endpoint
+    THEN the rows before it are inserted and it is reported, not inserted
+    """
+    body = (
+        "title,description\n"
+        "Complete,Fine\n"
+        'Broken,"never closed\n'
+        "line,x\n"
+    )
+
+    response = client.post(
+        "/api/tasks/import", params={"format": "csv"}, content=body
+    )
+
+    data = response.json()
+    assert data["inserted"] == 1
+    assert data["errors"] == [
+        {"line": 3, "detail": "Unterminated quoted value"}
+    ]
+
+
+@pytest.mark.query_budget(1)
+def test_get_todo_not_modified(db):
+    """
+    GIVEN the ETag of a Todo
+    WHEN a GET request is made with it in If-None-Match
+    THEN a 304 status code and an empty body are returned
+    """
+    todo = todo_crud.create(
+        db, TodoCreate(title="Test todo", description="Test description")
+    )
+    etag = client.get(f"/api/tasks/{todo.id}").headers["etag"]
+
+    response = client.get(
+        f"/api/tasks/{todo.id}", headers={"If-None-Match": etag}
+    )
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+@pytest.mark.query_budget(2)
+def test_get_todos_not_modified(db):
+    """
+    GIVEN the ETag of a page of Todos
+    WHEN the page is requested again before and after a change
+    THEN a 304 status code is returned only while nothing changed
+    """
+    todo_crud.create(
+        db, TodoCreate(title="Test todo", description="Test description")
+    )
+    etag = client.get("/api/tasks").headers["etag"]
+
+    response = client.get("/api/tasks", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    todo_crud.create(
+        db, TodoCreate(title="Test todo", description="Test description")
+    )
+    response = client.get("/api/tasks", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+@pytest.mark.query_budget(2)
+def test_get_todos_not_modified_skips_serialization(db, monkeypatch):
+    """
+    GIVEN the ETags of a page of Todos with all fields and with a projection
+    WHEN they are sent back in If-None-Match, then a Todo is updated
+    THEN the 304s are answered without validating or encoding the page, the
+    projection has its own ETag and the update changes both
+    """
+    todo = todo_crud.create(
+        db, TodoCreate(title="Test todo", description="Test description")
+    )
+    full = client.get("/api/tasks").headers["etag"]
+    projected = client.get("/api/tasks", params={"fields": "title"})
+    assert set(projected.json()["data"][0]) == {"title"}
+
+    def fail(columns):
+        raise AssertionError("the page was serialized")
+
+    with monkeypatch.context() as patch:
+        patch.setattr("api.todo.get_page_adapter", fail)
+        response = client.get("/api/tasks", headers={"If-None-Match": full})
+        assert response.status_code == 304
+        response = client.get(
+            "/api/tasks",
+            params={"fields": "title"},
+            headers={"If-None-Match": projected.headers["etag"]},
+        )
+        assert response.status_code == 304
+
+    todo_crud.update(db, todo.id, {"is_completed": True})
+
+    assert projected.headers["etag"] != full
+    response = client.get("/api/tasks", headers={"If-None-Match": full})
+    assert response.status_code == 200
+
+
+@pytest.mark.query_budget(1)
+def test_update_todo_if_match(db):
+    """
+    GIVEN the ETag of a Todo
+    WHEN two PUT requests are sent with that ETag in If-Match
+    THEN the first one succeeds and the second one gets a 412
+    """
+    todo = todo_crud.create(
+        db, TodoCreate(title="Test todo", description="Test description")
+    )
+    etag = client.get(f"/api/tasks/{todo.id}").headers["etag"]
+    payload = {"title": "Test todo updated", "description": None}
+
+    first = client.put(
+        f"/api/tasks/{todo.id}", json=payload, headers={"If-Match": etag}
+    )
+    second = client.put(
+        f"/api/tasks/{todo.id}", json=payload, headers={"If-Match": etag}
+    )
+
+    assert first.status_code == 200
+    assert first.headers["etag"] != etag
+    assert second.status_code == 412
+
+
+@pytest.mark.query_budget(2)
+def test_search_todos(db):
+    """
+    GIVEN Todo objects sharing a word in their title or description
+    WHEN the /api/tasks/search endpoint is queried for that word
+    THEN the active matches are returned, title matches first
+    """
+    word = f"search{uuid4().hex}"
+    in_title = todo_crud.create(
+        db, TodoCreate(title=f"Buy {word}", description="at the store")
+    )
+    in_description = todo_crud.create(
+        db, TodoCreate(title="Write report", description=f"about {word} x y")
+    )
+    deleted = todo_crud.create(db, TodoCreate(title=word, description=None))
+    todo_crud.delete(db, deleted.id)
+
+    response = client.get("/api/tasks/search", params={"q": word})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 2
+    assert [todo["id"] for todo in data["data"]] == [
+        str(in_title.id),
+        str(in_description.id),
+    ]
+
+    response = client.get(
+        "/api/tasks/search", params={"q": word, "limit": 1, "offset": 1}
+    )
+    assert [todo["id"] for todo in response.json()["data"]] == [
+        str(in_description.id)
+    ]
+
+
+@pytest.mark.query_budget(2)
+def test_search_todos_after_update(db):
+    """
+    GIVEN a Todo object whose title is changed
+    WHEN the /api/tasks/search endpoint is queried
+    THEN the Todo is found by its new title only
+    """
+    old, new = f"old{uuid4().hex}", f"new{uuid4().hex}"
+    todo = todo_crud.create(db, TodoCreate(title=old, description=None))
+
+    response = client.put(
+        f"/api/tasks/{todo.id}",
+        json={"title": new, "description": None, "is_completed": False},
+    )
+    assert response.status_code == 200
+
+    assert client.get("/api/tasks/search", params={"q": old}).json() == {
+        "total": 0,
+        "data": [],
+        "next_cursor": None,
+    }
+    data = client.get("/api/tasks/search", params={"q": new}).json()
+    assert [todo["id"] for todo in data["data"]] == [str(todo.id)]
+
+
+@pytest.mark.query_budget(2)
+def test_search_todos_syntax(db):
+    """
+    GIVEN a query made of full-text search operators
+    WHEN the /api/tasks/search endpoint is queried
+    THEN it is searched as plain words instead of failing
+    """
+    response = client.get("/api/tasks/search", params={"q": '"OR - NEAR(x'})
+    assert response.status_code == 200
+    assert response.json()["total"] == 0
+
+
+@pytest.mark.query_budget(2)
+def test_get_todos_filtered_and_sorted(db):
+    """
+    GIVEN Todo objects sharing a title prefix, some of them completed
+    WHEN the /api/tasks pages are requested with filters and a sort order
+    THEN only the matching Todos are returned, in that order, across pages
+    """
+    prefix = f"filter{uuid4().hex}_%"
+    titles = [f"{prefix}{letter}" for letter in "cadb"]
+    for i, title in enumerate(titles):
+        todo_crud.create(
+            db,
+            TodoCreate(title=title, description=None, is_completed=i % 2 == 0),
+        )
+    todo_crud.create(db, TodoCreate(title="filterunrelated", description=None))
+
+    seen = []
+    params = {"title_prefix": prefix, "sort": "-title", "limit": 1}
+    while True:
+        data = client.get("/api/tasks", params=params).json()
+        assert data["total"] == 4
+        seen.extend(todo["title"] for todo in data["data"])
+        if data["next_cursor"] is None:
+            break
+        params["cursor"] = data["next_cursor"]
+    assert seen == sorted(titles, reverse=True)
+
+    params = {"title_prefix": prefix, "is_completed": True, "sort": "title"}
+    data = client.get("/api/tasks", params=params).json()
+    assert data["total"] == 2
+    assert [todo["title"] for todo in data["data"]] == [
+        f"{prefix}c",
+        f"{prefix}d",
+    ]
+
+
+@pytest.mark.query_budget(2)
+def test_get_todos_fields(db):
+    """
+    GIVEN a Todo object
+    WHEN the /api/tasks page is requested with a fields projection
+    THEN the Todos only have the requested fields
+    """
+    title = f"fields{uuid4().hex}"
+    todo = todo_crud.create(db, TodoCreate(title=title, description="long"))
+
+    response = client.get(
+        "/api/tasks",
+        params={"title_prefix": title, "fields": "id,title,is_completed"},
+    )
+    assert response.status_code == 200
+    assert response.json()["data"] == [
+        {"id": str(todo.id), "title": title, "is_completed": False}
+    ]
+
+    response = client.get("/api/tasks", params={"fields": "id,password"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown fields: password"
+
+
+@pytest.mark.query_budget(1)
+def test_update_todo_single_statement(db):
+    """
+    GIVEN a Todo object
+    WHEN a PUT request without If-Match is made to the /api/tasks endpoint
+    THEN the Todo is updated and read back with a single UPDATE statement
+    """
+    todo = todo_crud.create(db, TodoCreate(title="Test todo", description=None))
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = async_engine.sync_engine
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        response = client.put(
+            f"/api/tasks/{todo.id}",
+            json={"title": "Updated", "description": None},
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert response.status_code == 200
+    assert response.json()["title"] == "Updated"
+    assert len(statements) == 1
+    assert statements[0].startswith("UPDATE todo")
+
+
+@pytest.mark.query_budget(1)
+def test_patch_todo(db):
+    """
+    GIVEN a Todo object
+    WHEN a PATCH request with some of its fields is made to /api/tasks
+    THEN only these fields change, and explicit nulls are applied
+    """
+    todo = todo_crud.create(
+        db, TodoCreate(title="Test todo", description="Test description")
+    )
+
+    response = client.patch(
+        f"/api/tasks/{todo.id}", json={"is_completed": True}
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "id": str(todo.id),
+        "title": "Test todo",
+        "description": "Test description",
+        "is_completed": True,
+        "version": 2,
+    }
+    assert response.headers["ETag"]
+
+    response = client.patch(f"/api/tasks/{todo.id}", json={"description": None})
+    assert response.json()["description"] is None
+    assert response.json()["is_completed"] is True
+
+
+def test_patch_todo_empty(db):
+    """
+    GIVEN a Todo object
+    WHEN PATCH requests without fields are made to /api/tasks
+    THEN the Todo is returned unchanged, with the same version and ETag
+    """
+    todo = todo_crud.create(db, TodoCreate(title="Test todo", description=None))
+
+    first = client.patch(f"/api/tasks/{todo.id}", json={})
+    second = client.patch(f"/api/tasks/{todo.id}", json={"version": 1})
+
+    assert first.status_code == second.status_code == 200
+    assert first.json()["version"] == second.json()["version"] == 1
+    assert first.headers["ETag"] == second.headers["ETag"]
+    response = client.patch(f"/api/tasks/{todo.id}", json={"version": 2})
+    assert response.status_code == 409
+
+
+@pytest.mark.query_budget(1)
+def test_patch_todo_invalid(db):
+    """
+    GIVEN a Todo object and a missing id
+    WHEN PATCH requests with a null title or the missing id are made
+    THEN a 422 and a 404 status code are returned
+    """
+    todo = todo_crud.create(db, TodoCreate(title="Test todo", description=None))
+
+    response = client.patch(f"/api/tasks/{todo.id}", json={"title": None})
+    assert response.status_code == 422
+
+    response = client.patch(f"/api/tasks/{uuid4()}", json={"title": "x"})
+    assert response.status_code == 404
+
+
+def test_update_without_returning(db, monkeypatch):
+    """
+    GIVEN a dialect without UPDATE ... RETURNING
+    WHEN a Todo is updated
+    THEN the row is read back after the UPDATE
+    """
+    todo = todo_crud.create(db, TodoCreate(title="Test todo", description=None))
+    version = todo.version
+    monkeypatch.setattr(db.get_bind().dialect, "update_returning", False)
+
+    updated = todo_crud.update(db, todo.id, {"title": "Updated"})
+    assert updated.title == "Updated"
+    assert updated.version == version + 1
+    assert todo_crud.update(db, uuid4(), {"title": "Updated"}) is None
+
+
+@pytest.mark.query_budget(2)
+def test_update_todo_version_conflict(db):
+    """
+    GIVEN a Todo object updated since a client read it
+    WHEN the client writes with the version it read
+    THEN a 409 status code is returned and the Todo is unchanged
+    """
+    todo = todo_crud.create(db, TodoCreate(title="Test todo", description=None))
+    version = todo.version
+    client.patch(f"/api/tasks/{todo.id}", json={"title": "First"})
+
+    response = client.put(
+        f"/api/tasks/{todo.id}",
+        json={"title": "Second", "description": None, "version": version},
+    )
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Todo has changed"
+
+    response = client.delete(
+        f"/api/tasks/{todo.id}", params={"version": version}
+    )
+    assert response.status_code == 409
+
+    response = client.patch(
+        f"/api/tasks/{todo.id}",
+        json={"title": "Second", "version": version + 1},
+    )
+    assert response.status_code == 200
+    assert response.json()["title"] == "Second"
+    assert response.json()["version"] == version + 2
+
+
+def test_update_version_conflict_error(db):
+    """
+    GIVEN a Todo object and a stale version
+    WHEN the Todo is updated expecting that version
+    THEN a VersionConflictError with both versions is raised
+    """
+    todo = todo_crud.create(db, TodoCreate(title="Test todo", description=None))
+
+    with pytest.raises(VersionConflictError) as error:
+        todo_crud.update(db, todo.id, {"title": "x"}, expected_version=0)
+    assert (error.value.expected, error.value.current) == (0, 1)
+    assert todo_crud.update(db, uuid4(), {"title": "x"}, 1) is None